@@ -25,7 +25,7 @@ import os
 if os.name == 'nt':  # sys.platform == 'win32':
     from serial.serialwin32 import Serial
 elif os.name == 'posix':
-    from serial.serialposix import Serial, PosixPollSerial, VTIMESerial  # noqa
+    from serial.serialposix import Serial, PosixPollSerial, PosixEpollSerial, VTIMESerial  # noqa
 else:
     raise ImportError("Sorry: no implementation for your platform ('{}') available".format(os.name))
 
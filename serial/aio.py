@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+#
+# Working with asyncio and pySerial
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Support asyncio with serial ports.
+
+The serial port is registered with the event loop using add_reader() and
+add_writer() so that any number of ports can be served from one thread.
+This requires a serial instance with a fileno(), i.e. the POSIX backend and
+handlers based on it (e.g. spy://, alt://).
+
+The port is operated in non-blocking mode (timeout=0, write_timeout=0).
+Calls to cancel_read() or cancel_write() on the serial instance result in
+an empty read or write and do not disturb the transport.
+"""
+from __future__ import absolute_import
+
+import asyncio
+import errno
+
+import serial
+
+
+class SerialTransport(asyncio.Transport):
+    """\
+    An asyncio transport for a serial port. The protocol may implement
+    ``modem_lines_changed(cts, dsr, ri, cd)``, it is called when the state
+    of the modem lines changes, if a modem_poll_interval is given.
+    """
+
+    max_read_size = 1024
+
+    def __init__(self, loop, protocol, serial_instance, modem_poll_interval=None):
+        super(SerialTransport, self).__init__()
+        self._loop = loop
+        self._protocol = protocol
+        self._serial = serial_instance
+        self._closing = False
+        self._protocol_paused = False
+        self._reading_paused = False
+        self._write_buffer = []
+        self._write_buffer_size = 0
+        self._high_water = self._low_water = 0
+        self.set_write_buffer_limits()
+        self._modem_poll_interval = modem_poll_interval
+        self._modem_poll_handle = None
+        self._modem_lines = None
+
+        self._serial.timeout = 0
+        self._serial.write_timeout = 0
+
+        self._loop.call_soon(self._protocol.connection_made, self)
+        self._loop.call_soon(self._ensure_reader)
+        if modem_poll_interval is not None:
+            self._loop.call_soon(self._poll_modem_lines)
+
+    @property
+    def serial(self):
+        """The underlying Serial instance, e.g. to control RTS/DTR"""
+        return self._serial
+
+    def get_extra_info(self, name, default=None):
+        """Return 'serial' or the transport default"""
+        if name == 'serial':
+            return self._serial
+        return super(SerialTransport, self).get_extra_info(name, default)
+
+    def is_closing(self):
+        """Return True if the transport is closing or closed"""
+        return self._closing
+
+    def close(self):
+        """\
+        Close the transport. Buffered data is written asynchronously, the
+        protocol's connection_lost() is called when that is done.
+        """
+        if not self._closing:
+            self._close(None)
+
+    def abort(self):
+        """Close the transport immediately, discarding buffered data"""
+        self._abort(None)
+
+    # - - - reading
+
+    def pause_reading(self):
+        """Stop calling the protocol's data_received() until resume_reading()"""
+        if not self._reading_paused:
+            self._reading_paused = True
+            self._remove_reader()
+
+    def resume_reading(self):
+        """Resume delivery of received data to the protocol"""
+        if self._reading_paused:
+            self._reading_paused = False
+            self._ensure_reader()
+
+    def is_reading(self):
+        """Return True if the transport is receiving"""
+        return not self._reading_paused and not self._closing
+
+    def _ensure_reader(self):
+        if not self._reading_paused and not self._closing:
+            self._loop.add_reader(self._serial.fileno(), self._read_ready)
+
+    def _remove_reader(self):
+        if self._serial is not None and self._serial.is_open:
+            self._loop.remove_reader(self._serial.fileno())
+
+    def _read_ready(self):
+        try:
+            data = self._serial.read(self.max_read_size)
+        except serial.SerialException as exc:
+            self._close(exc)
+        else:
+            if data:
+                self._protocol.data_received(data)
+
+    # - - - writing
+
+    def write(self, data):
+        """\
+        Write data to the port. As much as possible is written immediately,
+        the rest is buffered and written when the port is ready.
+        """
+        if self._closing or not data:
+            return
+        data = serial.to_bytes(data)
+        if not self._write_buffer:
+            try:
+                n = self._serial.write(data)
+            except serial.SerialException as exc:
+                self._fatal_error(exc)
+                return
+            if n == len(data):
+                return
+            data = data[n:]
+            self._loop.add_writer(self._serial.fileno(), self._write_ready)
+        self._write_buffer.append(data)
+        self._write_buffer_size += len(data)
+        self._maybe_pause_protocol()
+
+    def can_write_eof(self):
+        """Serial ports do not support end-of-file"""
+        return False
+
+    def get_write_buffer_size(self):
+        """Return the number of bytes waiting to be written"""
+        return self._write_buffer_size
+
+    def get_write_buffer_limits(self):
+        """Return a tuple (low, high) of the write buffer water marks"""
+        return (self._low_water, self._high_water)
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        """\
+        Set the water marks for write flow control. pause_writing() of the
+        protocol is called when the buffer size exceeds high and
+        resume_writing() when it drops to low or below.
+        """
+        if high is None:
+            high = 64 * 1024 if low is None else 4 * low
+        if low is None:
+            low = high // 4
+        if not high >= low >= 0:
+            raise ValueError('high ({!r}) must be >= low ({!r}) must be >= 0'.format(high, low))
+        self._high_water = high
+        self._low_water = low
+        self._maybe_pause_protocol()
+
+    def _write_ready(self):
+        try:
+            n = self._serial.writev(self._write_buffer)
+        except serial.SerialException as exc:
+            self._fatal_error(exc)
+            return
+        self._write_buffer_size -= n
+        # drop the buffers that were sent completely, slice a partial one
+        done = 0
+        while n and n >= len(self._write_buffer[done]):
+            n -= len(self._write_buffer[done])
+            done += 1
+        del self._write_buffer[:done]
+        if n:
+            self._write_buffer[0] = self._write_buffer[0][n:]
+        self._maybe_resume_protocol()
+        if not self._write_buffer:
+            self._loop.remove_writer(self._serial.fileno())
+            if self._closing:
+                self._call_connection_lost(None)
+
+    def _maybe_pause_protocol(self):
+        if self._write_buffer_size > self._high_water and not self._protocol_paused:
+            self._protocol_paused = True
+            self._protocol.pause_writing()
+
+    def _maybe_resume_protocol(self):
+        if self._protocol_paused and self._write_buffer_size <= self._low_water:
+            self._protocol_paused = False
+            self._protocol.resume_writing()
+
+    # - - - modem lines
+
+    def _poll_modem_lines(self):
+        self._modem_poll_handle = None
+        if self._closing:
+            return
+        try:
+            lines = (self._serial.cts, self._serial.dsr, self._serial.ri, self._serial.cd)
+        except IOError as exc:
+            # devices without modem lines, e.g. pseudo terminals: stop polling
+            if exc.errno not in (errno.EINVAL, errno.ENOTTY):
+                self._fatal_error(exc)
+            return
+        if lines != self._modem_lines:
+            self._modem_lines = lines
+            if hasattr(self._protocol, 'modem_lines_changed'):
+                self._protocol.modem_lines_changed(*lines)
+        self._modem_poll_handle = self._loop.call_later(
+            self._modem_poll_interval, self._poll_modem_lines)
+
+    # - - - closing
+
+    def _close(self, exc):
+        self._closing = True
+        self._remove_reader()
+        if self._modem_poll_handle is not None:
+            self._modem_poll_handle.cancel()
+            self._modem_poll_handle = None
+        if exc is not None or not self._write_buffer:
+            self._abort(exc)
+
+    def _fatal_error(self, exc):
+        self._abort(exc)
+
+    def _abort(self, exc):
+        if self._serial is None:
+            return  # connection already lost
+        self._closing = True
+        self._remove_reader()
+        if self._write_buffer:
+            if self._serial.is_open:
+                self._loop.remove_writer(self._serial.fileno())
+            del self._write_buffer[:]
+            self._write_buffer_size = 0
+        if self._modem_poll_handle is not None:
+            self._modem_poll_handle.cancel()
+            self._modem_poll_handle = None
+        self._loop.call_soon(self._call_connection_lost, exc)
+
+    def _call_connection_lost(self, exc):
+        if self._serial is None:
+            return  # already called
+        try:
+            self._serial.close()
+        finally:
+            self._serial = None
+            try:
+                self._protocol.connection_lost(exc)
+            finally:
+                self._protocol = None
+                self._loop = None
+
+
+async def create_serial_connection(loop, protocol_factory, *args, **kwargs):
+    """\
+    Open a serial port (arguments are passed to serial_for_url) and connect
+    it to a protocol instance created with protocol_factory. Return a tuple
+    (transport, protocol).
+
+    The keyword argument modem_poll_interval (seconds) enables polling of
+    the modem lines, see SerialTransport.
+    """
+    modem_poll_interval = kwargs.pop('modem_poll_interval', None)
+    ser = serial.serial_for_url(*args, **kwargs)
+    protocol = protocol_factory()
+    transport = SerialTransport(loop, protocol, ser, modem_poll_interval)
+    return (transport, protocol)
+
+
+async def open_serial_connection(*args, limit=2 ** 16, **kwargs):
+    """\
+    Open a serial port (arguments are passed to serial_for_url) and return a
+    tuple (reader, writer) of asyncio StreamReader and StreamWriter
+    instances, similar to asyncio.open_connection().
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=limit, loop=loop)
+    protocol = asyncio.StreamReaderProtocol(reader, loop=loop)
+    transport, _ = await create_serial_connection(loop, lambda: protocol, *args, **kwargs)
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    return (reader, writer)
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# test
+if __name__ == '__main__':
+    # pylint: disable=wrong-import-position
+    import os
+    import pty
+    import sys
+
+    async def main():
+        master, slave = pty.openpty()
+        reader, writer = await open_serial_connection(os.ttyname(slave), baudrate=115200)
+        os.write(master, b'hello\n')
+        sys.stdout.write('line received: {!r}\n'.format(await reader.readline()))
+        writer.write(b'world\n')
+        await writer.drain()
+        sys.stdout.write('line sent: {!r}\n'.format(os.read(master, 100)))
+        writer.close()
+        await writer.wait_closed()
+
+    asyncio.run(main())
@@ -0,0 +1,419 @@
+#! python
+#
+# Throughput and latency benchmarks for pySerial.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Throughput and latency benchmarks for pySerial.
+
+Each benchmark runs over a transport whose far end echoes all data:
+
+- ``loop``: the ``loop://`` handler
+- ``pty``: a pseudo terminal pair, the master side echoes (Posix)
+- ``socket``: ``socket://`` connected to a local TCP echo server
+- ``rfc2217``: ``rfc2217://`` connected to a local RFC 2217 server that is
+  backed by a ``loop://`` port
+
+Parser benchmarks (``packetizer``, ``framed_packet``) do not use a port.
+Run ``python -m serial.benchmarks --help`` for the command line interface.
+"""
+from __future__ import absolute_import
+
+import contextlib
+import datetime
+import os
+import platform
+import select
+import socket
+import threading
+import time
+
+import serial
+import serial.rfc2217
+import serial.threaded
+from serial.serialutil import LatencyHistogram
+
+try:
+    import pty
+except ImportError:
+    pty = None
+
+TRANSPORTS = ('loop', 'pty', 'socket', 'rfc2217')
+PORT_BENCHMARKS = ('read', 'read_until', 'readline', 'reader_thread', 'latency')
+PARSER_BENCHMARKS = ('packetizer', 'framed_packet')
+BENCHMARKS = PORT_BENCHMARKS + PARSER_BENCHMARKS
+
+# line length of read_until/readline and packet length of the packetizers
+RECORD_SIZE = 64
+BLOCK_SIZE = 4096
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# transports
+
+def _start_thread(target, *args):
+    thread = threading.Thread(target=target, args=args)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+@contextlib.contextmanager
+def _loop_transport():
+    yield 'loop://'
+
+
+@contextlib.contextmanager
+def _pty_transport():
+    if pty is None:
+        raise NotImplementedError('pty is not supported on this platform')
+    master, slave = pty.openpty()
+    stop_r, stop_w = os.pipe()
+
+    def echo():
+        while True:
+            ready, _, _ = select.select([master, stop_r], [], [])
+            if stop_r in ready:
+                break
+            try:
+                data = os.read(master, 65536)
+            except OSError:
+                break   # slave closed
+            while data:
+                data = data[os.write(master, data):]
+
+    thread = _start_thread(echo)
+    try:
+        yield os.ttyname(slave)
+    finally:
+        os.write(stop_w, b'x')
+        thread.join()
+        for fd in (master, slave, stop_r, stop_w):
+            os.close(fd)
+
+
+@contextlib.contextmanager
+def _server(handle_connection):
+    """Run a TCP server for one connection on localhost, yield its port"""
+    server = socket.socket()
+    server.bind(('localhost', 0))
+    server.listen(1)
+
+    def accept():
+        try:
+            connection, _ = server.accept()
+        except OSError:
+            return  # closed without connection
+        with connection:
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            handle_connection(connection)
+
+    thread = _start_thread(accept)
+    try:
+        yield server.getsockname()[1]
+    finally:
+        server.close()
+        thread.join(5)
+
+
+def _echo_connection(connection):
+    while True:
+        data = connection.recv(65536)
+        if not data:
+            break
+        connection.sendall(data)
+
+
+@contextlib.contextmanager
+def _socket_transport():
+    with _server(_echo_connection) as port:
+        yield 'socket://localhost:{}'.format(port)
+
+
+def _rfc2217_connection(connection):
+    """Serve a loop:// port with RFC 2217, similar to examples/rfc2217_server.py"""
+    ser = serial.serial_for_url('loop://', timeout=0.05)
+    write_lock = threading.Lock()
+
+    class Connection(object):
+        def write(self, data):
+            with write_lock:
+                connection.sendall(data)
+
+    manager = serial.rfc2217.PortManager(ser, Connection())
+    alive = [True]
+
+    def reader():
+        while alive[0]:
+            data = ser.read(ser.in_waiting or 1)
+            if data:
+                try:
+                    Connection().write(manager.escape_bytes(data))
+                except OSError:
+                    break
+
+    thread = _start_thread(reader)
+    try:
+        while True:
+            data = connection.recv(65536)
+            if not data:
+                break
+            ser.write(manager.filter_bytes(data))
+    finally:
+        alive[0] = False
+        thread.join()
+        ser.close()
+
+
+@contextlib.contextmanager
+def _rfc2217_transport():
+    with _server(_rfc2217_connection) as port:
+        yield 'rfc2217://localhost:{}'.format(port)
+
+
+_TRANSPORT_FACTORIES = {
+    'loop': _loop_transport,
+    'pty': _pty_transport,
+    'socket': _socket_transport,
+    'rfc2217': _rfc2217_transport,
+}
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# benchmarks
+
+def _pattern(size):
+    """Test data with all byte values (so that e.g. IAC escaping is exercised)"""
+    return (bytes(range(256)) * (size // 256 + 1))[:size]
+
+
+def _records(size, terminator):
+    """Test data of size bytes, split in records ending with terminator"""
+    record = bytes(b'0123456789abcdef' * (RECORD_SIZE // 16))[:RECORD_SIZE - len(terminator)] + terminator
+    return record * max(1, size // RECORD_SIZE)
+
+
+def _write_all(ser, data):
+    """Write data in blocks from a separate thread, return the thread"""
+    def writer():
+        for pos in range(0, len(data), BLOCK_SIZE):
+            ser.write(data[pos:pos + BLOCK_SIZE])
+    return _start_thread(writer)
+
+
+def _throughput(total, seconds, **extra):
+    result = {
+        'bytes': total,
+        'seconds': seconds,
+        'mb_per_s': total / seconds / 1e6 if seconds else None,
+    }
+    result.update(extra)
+    return result
+
+
+def bench_read(ser, size):
+    """Echo size bytes and receive them with read()"""
+    data = _pattern(size)
+    received = 0
+    start = time.perf_counter()
+    writer = _write_all(ser, data)
+    while received < size:
+        chunk = ser.read(min(BLOCK_SIZE, size - received))
+        if not chunk:
+            raise serial.SerialException('timeout after {} of {} bytes'.format(received, size))
+        received += len(chunk)
+    seconds = time.perf_counter() - start
+    writer.join()
+    return _throughput(received, seconds)
+
+
+def _bench_lines(ser, size, read_line):
+    data = _records(size, b'\n')
+    lines = 0
+    received = 0
+    start = time.perf_counter()
+    writer = _write_all(ser, data)
+    while received < len(data):
+        line = read_line()
+        if not line.endswith(b'\n'):
+            raise serial.SerialException('timeout after {} of {} bytes'.format(received, len(data)))
+        lines += 1
+        received += len(line)
+    seconds = time.perf_counter() - start
+    writer.join()
+    return _throughput(received, seconds, records=lines)
+
+
+def bench_read_until(ser, size):
+    """Echo size bytes of lines and receive them with read_until()"""
+    return _bench_lines(ser, size, lambda: ser.read_until(b'\n'))
+
+
+def bench_readline(ser, size):
+    """Echo size bytes of lines and receive them with readline()"""
+    return _bench_lines(ser, size, ser.readline)
+
+
+def bench_reader_thread(ser, size):
+    """Echo size bytes of packets, received with ReaderThread and Packetizer"""
+    data = _records(size, b'\0')
+    done = threading.Event()
+
+    class CountingPacketizer(serial.threaded.Packetizer):
+        def __init__(self):
+            super(CountingPacketizer, self).__init__()
+            self.packets = 0
+            self.received = 0
+
+        def handle_packet(self, packet):
+            self.packets += 1
+            self.received += len(packet) + 1
+            if self.received >= len(data):
+                done.set()
+
+    thread = serial.threaded.ReaderThread(ser, CountingPacketizer)
+    thread.start()
+    _, protocol = thread.connect()
+    start = time.perf_counter()
+    writer = _write_all(ser, data)
+    finished = done.wait(max(10, size / 10000.0))
+    seconds = time.perf_counter() - start
+    writer.join()
+    thread.stop()
+    if not finished:
+        raise serial.SerialException('timeout after {} of {} bytes'.format(protocol.received, len(data)))
+    return _throughput(protocol.received, seconds, records=protocol.packets)
+
+
+def bench_latency(ser, count, message_size=16):
+    """Measure the round trip time of count small messages"""
+    message = _pattern(message_size)
+    histogram = LatencyHistogram()
+    for _ in range(count):
+        start = time.perf_counter_ns()
+        ser.write(message)
+        if len(ser.read(message_size)) != message_size:
+            raise serial.SerialException('timeout waiting for echo')
+        histogram.record(time.perf_counter_ns() - start)
+    return histogram.summary()
+
+
+def _bench_parser(protocol, data, chunk_size):
+    start = time.perf_counter()
+    for pos in range(0, len(data), chunk_size):
+        protocol.data_received(data[pos:pos + chunk_size])
+    return time.perf_counter() - start
+
+
+def bench_packetizer(size, chunk_size=BLOCK_SIZE):
+    """Feed size bytes of packets to a Packetizer"""
+    class NullPacketizer(serial.threaded.Packetizer):
+        def handle_packet(self, packet):
+            pass
+
+    data = _records(size, b'\0')
+    return _throughput(len(data), _bench_parser(NullPacketizer(), data, chunk_size), chunk_size=chunk_size)
+
+
+def bench_framed_packet(size, chunk_size=BLOCK_SIZE):
+    """Feed size bytes of packets to a FramedPacket"""
+    class NullFramedPacket(serial.threaded.FramedPacket):
+        def handle_packet(self, packet):
+            pass
+
+    data = b''.join(b'(' + record + b')' for record in
+                    [_records(RECORD_SIZE, b'.')] * max(1, size // (RECORD_SIZE + 2)))
+    return _throughput(len(data), _bench_parser(NullFramedPacket(), data, chunk_size), chunk_size=chunk_size)
+
+
+_PORT_BENCHMARK_FUNCTIONS = {
+    'read': bench_read,
+    'read_until': bench_read_until,
+    'readline': bench_readline,
+    'reader_thread': bench_reader_thread,
+    'latency': bench_latency,
+}
+
+_PARSER_BENCHMARK_FUNCTIONS = {
+    'packetizer': bench_packetizer,
+    'framed_packet': bench_framed_packet,
+}
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+def run(transports=TRANSPORTS, benchmarks=BENCHMARKS, size=256 * 1024, count=1000, timeout=5, progress=None):
+    """\
+    Run the given benchmarks and return a dictionary with information about
+    the environment and a list of results. size is the number of bytes per
+    throughput benchmark and count the number of round trips of the latency
+    benchmark. progress is an optional callable that is called with a text
+    before each benchmark.
+
+    Benchmarks that fail or are not supported on a transport are reported
+    with an 'error' entry instead of measurements.
+    """
+    for name in transports:
+        if name not in TRANSPORTS:
+            raise ValueError('unknown transport: {!r}'.format(name))
+    for name in benchmarks:
+        if name not in BENCHMARKS:
+            raise ValueError('unknown benchmark: {!r}'.format(name))
+    results = []
+    for benchmark in benchmarks:
+        if benchmark in _PARSER_BENCHMARK_FUNCTIONS:
+            if progress is not None:
+                progress(benchmark)
+            result = {'benchmark': benchmark, 'transport': None}
+            result.update(_PARSER_BENCHMARK_FUNCTIONS[benchmark](size))
+            results.append(result)
+    for transport in transports:
+        for benchmark in benchmarks:
+            if benchmark not in _PORT_BENCHMARK_FUNCTIONS:
+                continue
+            if progress is not None:
+                progress('{} over {}'.format(benchmark, transport))
+            result = {'benchmark': benchmark, 'transport': transport}
+            try:
+                # a new port (and server) per benchmark, so that one failure
+                # does not affect the others
+                with _TRANSPORT_FACTORIES[transport]() as url:
+                    with serial.serial_for_url(url, timeout=timeout) as ser:
+                        parameter = count if benchmark == 'latency' else size
+                        result.update(_PORT_BENCHMARK_FUNCTIONS[benchmark](ser, parameter))
+            except (NotImplementedError, serial.SerialException) as e:
+                result['error'] = str(e)
+            results.append(result)
+    return {
+        'pyserial': serial.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'time': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'size': size,
+        'count': count,
+        'results': results,
+    }
+
+
+def compare(old, new):
+    """\
+    Compare two result dictionaries as returned by run(). Return a list of
+    (benchmark, transport, metric, old value, new value) for all
+    measurements found in both.
+    """
+    def measurements(report):
+        values = {}
+        for result in report['results']:
+            key = (result['benchmark'], result['transport'])
+            for metric in ('mb_per_s', 'p50', 'p99'):
+                if result.get(metric) is not None:
+                    values[key + (metric,)] = result[metric]
+        return values
+
+    old_values = measurements(old)
+    new_values = measurements(new)
+    return [key + (old_values[key], new_values[key]) for key in new_values if key in old_values]
@@ -0,0 +1,109 @@
+#! python
+#
+# Command line interface of the pySerial benchmarks.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Run the pySerial benchmarks and write the results as JSON.
+
+Example: compare a new version against saved results::
+
+    python -m serial.benchmarks -o old.json
+    python -m serial.benchmarks --compare old.json
+"""
+from __future__ import absolute_import
+
+import argparse
+import json
+import sys
+
+from serial import benchmarks
+
+
+def _list(choices):
+    def parse(text):
+        names = [name.strip() for name in text.split(',') if name.strip()]
+        for name in names:
+            if name not in choices:
+                raise argparse.ArgumentTypeError(
+                    'invalid choice: {!r} (choose from {})'.format(name, ', '.join(choices)))
+        return names
+    return parse
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m serial.benchmarks',
+        description='Measure throughput and latency of pySerial backends.')
+
+    parser.add_argument(
+        '-t', '--transports',
+        type=_list(benchmarks.TRANSPORTS),
+        default=','.join(benchmarks.TRANSPORTS),
+        help='comma separated list of transports (default: %(default)s)')
+
+    parser.add_argument(
+        '-b', '--benchmarks',
+        type=_list(benchmarks.BENCHMARKS),
+        default=','.join(benchmarks.BENCHMARKS),
+        help='comma separated list of benchmarks (default: %(default)s)')
+
+    parser.add_argument(
+        '-s', '--size',
+        type=int,
+        default=256 * 1024,
+        help='bytes per throughput benchmark (default: %(default)s)')
+
+    parser.add_argument(
+        '-n', '--count',
+        type=int,
+        default=1000,
+        help='round trips of the latency benchmark (default: %(default)s)')
+
+    parser.add_argument(
+        '-o', '--output',
+        type=argparse.FileType('w'),
+        default=sys.stdout,
+        help='write the JSON results to this file (default: stdout)')
+
+    parser.add_argument(
+        '--compare',
+        metavar='FILE',
+        type=argparse.FileType('r'),
+        help='print the change relative to results saved in FILE')
+
+    parser.add_argument(
+        '-q', '--quiet',
+        action='store_true',
+        help='do not print progress messages')
+
+    args = parser.parse_args(args)
+
+    def progress(text):
+        if not args.quiet:
+            sys.stderr.write('--- {}\n'.format(text))
+
+    report = benchmarks.run(
+        transports=args.transports,
+        benchmarks=args.benchmarks,
+        size=args.size,
+        count=args.count,
+        progress=progress)
+    json.dump(report, args.output, indent=2)
+    args.output.write('\n')
+    if args.output is not sys.stdout:
+        args.output.close()
+
+    if args.compare:
+        old = json.load(args.compare)
+        for benchmark, transport, metric, old_value, new_value in benchmarks.compare(old, report):
+            sys.stderr.write('{:<14} {:<8} {:<9} {:>12.6g} -> {:>12.6g} ({:+.1%})\n'.format(
+                benchmark, transport or '-', metric, old_value, new_value,
+                new_value / old_value - 1 if old_value else 0))
+
+
+if __name__ == '__main__':
+    main()
@@ -69,14 +69,10 @@ try:
     import urlparse
 except ImportError:
     import urllib.parse as urlparse
-try:
-    import Queue
-except ImportError:
-    import queue as Queue
 
 import serial
 from serial.serialutil import SerialBase, SerialException, to_bytes, \
-    iterbytes, PortNotOpenError, Timeout
+    iterbytes, PortNotOpenError, Timeout, LF
 
 # port string is expected to be something like this:
 # rfc2217://host:port
@@ -234,6 +230,88 @@ INACTIVE = 'INACTIVE'
 REALLY_INACTIVE = 'REALLY_INACTIVE'
 
 
+class ReceiveBuffer(object):
+    """\
+    Thread safe buffer for received data. The reader thread appends with
+    put(), readers wait with a condition variable until enough data is
+    available, the timeout expires or the connection is lost.
+    """
+
+    def __init__(self):
+        self.changed = threading.Condition()
+        self._data = bytearray()
+        self._start = 0     # data before this index was already read
+        self.closed = False
+
+    def __len__(self):
+        return len(self._data) - self._start
+
+    def put(self, data):
+        """Append received data and wake up readers"""
+        with self.changed:
+            self._data += data
+            self.changed.notify_all()
+
+    def close(self):
+        """Mark the connection as lost, readers return what is buffered"""
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+
+    def clear(self):
+        """Discard all buffered data"""
+        with self.changed:
+            del self._data[:]
+            self._start = 0
+
+    def _take(self, size):
+        """Remove and return size bytes, the condition must be acquired"""
+        end = self._start + size
+        data = bytes(self._data[self._start:end])
+        if end >= len(self._data):
+            del self._data[:]
+            self._start = 0
+        else:
+            self._start = end
+            # compact when the read part dominates, amortized O(1) per byte
+            if end > 65536 and end > len(self._data) // 2:
+                del self._data[:end]
+                self._start = 0
+        return data
+
+    def read(self, size, timeout):
+        """\
+        Return up to size bytes, wait until size bytes are available, the
+        Timeout object timeout expires or the connection is lost.
+        """
+        with self.changed:
+            while len(self) < size and not self.closed and not timeout.expired():
+                self.changed.wait(timeout.time_left())
+            return self._take(min(size, len(self)))
+
+    def read_until(self, expected, size, timeout):
+        """\
+        Return the data up to and including expected or up to size bytes
+        when size is not None. Wait like read() and return what is buffered
+        when the timeout expires or the connection is lost.
+        """
+        lenterm = len(expected)
+        with self.changed:
+            searched = self._start
+            while True:
+                # the terminator may span the boundary to the data searched before
+                pos = self._data.find(expected, max(self._start, searched - lenterm + 1)) if lenterm else -1
+                if pos >= 0:
+                    n = pos + lenterm - self._start
+                    return self._take(n if size is None else min(n, size))
+                if size is not None and len(self) >= size:
+                    return self._take(size)
+                if self.closed or timeout.expired():
+                    return self._take(len(self))
+                searched = len(self._data)
+                self.changed.wait(timeout.time_left())
+
+
 class TelnetOption(object):
     """Manage a single telnet option, keeps track of DO/DONT WILL/WONT."""
 
@@ -330,11 +408,18 @@ class TelnetSubnegotiation(object):
         the client needs to know if the change is performed he has to check the
         state of this object.
         """
+        self.connection._internal_raw_write(self.request(value))
+
+    def request(self, value):
+        """\
+        Like set() but return the subnegotiation message instead of sending
+        it, so that several requests can be sent at once.
+        """
         self.value = value
         self.state = REQUESTED
-        self.connection.rfc2217_send_subnegotiation(self.option, self.value)
         if self.connection.logger:
             self.connection.logger.debug("SB Requesting {} -> {!r}".format(self.name, self.value))
+        return self.connection.rfc2217_subnegotiation_message(self.option, self.value)
 
     def is_ready(self):
         """\
@@ -353,12 +438,7 @@ class TelnetSubnegotiation(object):
         can also throw a value error when the answer from the server does not
         match the value sent.
         """
-        timeout_timer = Timeout(timeout)
-        while not timeout_timer.expired():
-            time.sleep(0.05)    # prevent 100% CPU load
-            if self.is_ready():
-                break
-        else:
+        if not self.connection._wait_for(self.is_ready, timeout):
             raise SerialException("timeout while waiting for option {!r}".format(self.name))
 
     def check_answer(self, suboption):
@@ -381,6 +461,8 @@ class Serial(SerialBase):
     BAUDRATES = (50, 75, 110, 134, 150, 200, 300, 600, 1200, 1800, 2400, 4800,
                  9600, 19200, 38400, 57600, 115200)
 
+    _read_ahead = True
+
     def __init__(self, *args, **kwargs):
         self._thread = None
         self._socket = None
@@ -388,6 +470,7 @@ class Serial(SerialBase):
         self._modemstate = None
         self._modemstate_timeout = Timeout(-1)
         self._remote_suspend_flow = False
+        self._flow_control = None
         self._write_lock = None
         self._ignore_set_control_answer = False
         self._poll_modem_state = False
@@ -396,6 +479,8 @@ class Serial(SerialBase):
         self._rfc2217_port_settings = None
         self._rfc2217_options = None
         self._read_buffer = None
+        # notified by the reader thread when an answer of the server arrived
+        self._state_changed = threading.Condition()
         super(Serial, self).__init__(*args, **kwargs)  # must be last call in case of auto-open
 
     def open(self):
@@ -417,9 +502,8 @@ class Serial(SerialBase):
             self._socket = None
             raise SerialException("Could not open port {}: {}".format(self.portstr, msg))
 
-        # use a thread save queue as buffer. it also simplifies implementing
-        # the read timeout
-        self._read_buffer = Queue.Queue()
+        # thread safe buffer that the reader thread fills
+        self._read_buffer = ReceiveBuffer()
         # to ensure that user writes does not interfere with internal
         # telnet/rfc2217 options establish a lock
         self._write_lock = threading.Lock()
@@ -457,6 +541,8 @@ class Serial(SerialBase):
         self._modemstate_timeout = Timeout(-1)
         # RFC 2217 flow control between server and client
         self._remote_suspend_flow = False
+        # flow control setting that the server confirmed
+        self._flow_control = None
 
         self.is_open = True
         self._thread = threading.Thread(target=self._telnet_read_loop)
@@ -469,13 +555,13 @@ class Serial(SerialBase):
             for option in self._telnet_options:
                 if option.state is REQUESTED:
                     self.telnet_send_option(option.send_yes, option.option)
+
             # now wait until important options are negotiated
-            timeout = Timeout(self._network_timeout)
-            while not timeout.expired():
-                time.sleep(0.05)    # prevent 100% CPU load
-                if sum(o.active for o in mandadory_options) == sum(o.state != INACTIVE for o in mandadory_options):
-                    break
-            else:
+            def negotiated():
+                active = sum(o.active for o in mandadory_options)
+                return active == sum(o.state != INACTIVE for o in mandadory_options)
+
+            if not self._wait_for(negotiated, self._network_timeout):
                 raise SerialException(
                     "Remote does not seem to support RFC2217 or BINARY mode {!r}".format(mandadory_options))
             if self.logger:
@@ -506,37 +592,56 @@ class Serial(SerialBase):
             raise NotImplementedError('write_timeout is currently not supported')
             # XXX
 
-        # Setup the connection
-        # to get good performance, all parameter changes are sent first...
         if not 0 < self._baudrate < 2 ** 32:
             raise ValueError("invalid baudrate: {!r}".format(self._baudrate))
-        self._rfc2217_port_settings['baudrate'].set(struct.pack(b'!I', self._baudrate))
-        self._rfc2217_port_settings['datasize'].set(struct.pack(b'!B', self._bytesize))
-        self._rfc2217_port_settings['parity'].set(struct.pack(b'!B', RFC2217_PARITY_MAP[self._parity]))
-        self._rfc2217_port_settings['stopsize'].set(struct.pack(b'!B', RFC2217_STOPBIT_MAP[self._stopbits]))
-
-        # and now wait until parameters are active
-        items = self._rfc2217_port_settings.values()
-        if self.logger:
-            self.logger.debug("Negotiating settings: {}".format(items))
-        timeout = Timeout(self._network_timeout)
-        while not timeout.expired():
-            time.sleep(0.05)    # prevent 100% CPU load
-            if sum(o.active for o in items) == len(items):
-                break
-        else:
-            raise SerialException("Remote does not accept parameter change (RFC2217): {!r}".format(items))
-        if self.logger:
-            self.logger.info("Negotiated settings: {}".format(items))
-
         if self._rtscts and self._xonxoff:
             raise ValueError('xonxoff and rtscts together are not supported')
         elif self._rtscts:
-            self.rfc2217_set_control(SET_CONTROL_USE_HW_FLOW_CONTROL)
+            flow_control = SET_CONTROL_USE_HW_FLOW_CONTROL
         elif self._xonxoff:
-            self.rfc2217_set_control(SET_CONTROL_USE_SW_FLOW_CONTROL)
+            flow_control = SET_CONTROL_USE_SW_FLOW_CONTROL
         else:
-            self.rfc2217_set_control(SET_CONTROL_USE_NO_FLOW_CONTROL)
+            flow_control = SET_CONTROL_USE_NO_FLOW_CONTROL
+
+        # Setup the connection
+        # to get good performance, all parameter changes are sent in one
+        # write and acknowledged together. values that the server already
+        # confirmed are not sent again
+        settings = (
+            (self._rfc2217_port_settings['baudrate'], struct.pack(b'!I', self._baudrate)),
+            (self._rfc2217_port_settings['datasize'], struct.pack(b'!B', self._bytesize)),
+            (self._rfc2217_port_settings['parity'], struct.pack(b'!B', RFC2217_PARITY_MAP[self._parity])),
+            (self._rfc2217_port_settings['stopsize'], struct.pack(b'!B', RFC2217_STOPBIT_MAP[self._stopbits])),
+        )
+        items = [item for item, value in settings if item.value != value or item.state != ACTIVE]
+        messages = [item.request(value) for item, value in settings if item in items]
+        if flow_control != self._flow_control and not self._ignore_set_control_answer:
+            control = self._rfc2217_options['control']
+            messages.append(control.request(flow_control))
+            items.append(control)
+        if messages:
+            if self.logger:
+                self.logger.debug("Negotiating settings: {}".format(items))
+            self._internal_raw_write(b''.join(messages))
+
+            # and now wait until parameters are active, a rejected value
+            # ends the wait early
+            def answered():
+                states = [o.state for o in items]
+                return REALLY_INACTIVE in states or all(state == ACTIVE for state in states)
+
+            self._wait_for(answered, self._network_timeout)
+            # is_ready() raises ValueError for a rejected value, e.g. a flow
+            # control that the server does not support
+            if not all([o.is_ready() for o in items]):
+                raise SerialException("Remote does not accept parameter change (RFC2217): {!r}".format(items))
+            if self.logger:
+                self.logger.info("Negotiated settings: {}".format(items))
+        if self._ignore_set_control_answer:
+            # the answer can not be used to confirm the flow control setting
+            self.rfc2217_set_control(flow_control)
+        else:
+            self._flow_control = flow_control
 
     def close(self):
         """Close port"""
@@ -597,7 +702,7 @@ class Serial(SerialBase):
         """Return the number of bytes currently in the input buffer."""
         if not self.is_open:
             raise PortNotOpenError()
-        return self._read_buffer.qsize()
+        return len(self._read_buffer) + len(self._pushback)
 
     def read(self, size=1):
         """\
@@ -607,21 +712,40 @@ class Serial(SerialBase):
         """
         if not self.is_open:
             raise PortNotOpenError()
-        data = bytearray()
-        try:
-            timeout = Timeout(self._timeout)
-            while len(data) < size:
-                if self._thread is None or not self._thread.is_alive():
-                    raise SerialException('connection failed (reader thread died)')
-                buf = self._read_buffer.get(True, timeout.time_left())
-                if buf is None:
-                    return bytes(data)
-                data += buf
-                if timeout.expired():
-                    break
-        except Queue.Empty:  # -> timeout
-            pass
-        return bytes(data)
+        if self._stats is not None:
+            return self._stats.timed_read(size, self._read, size)
+        return self._read(size)
+
+    def _read(self, size):
+        """Read size bytes from the read buffer filled by the reader thread"""
+        data = self._read_pushback(size)
+        if len(data) < size:
+            self._check_reader()
+            data += self._read_buffer.read(size - len(data), Timeout(self._timeout))
+        return data
+
+    def read_until(self, expected=LF, size=None):
+        """\
+        Read until an expected sequence is found (line feed by default), the size
+        is exceeded or until timeout occurs. The terminator is searched in the
+        receive buffer directly.
+        """
+        if not self.is_open:
+            raise PortNotOpenError()
+        if self._pushback:
+            return super(Serial, self).read_until(expected, size)
+        if self._stats is not None:
+            return self._stats.timed_read(0, self._read_until, expected, size)
+        return self._read_until(expected, size)
+
+    def _read_until(self, expected, size):
+        self._check_reader()
+        return self._read_buffer.read_until(expected, size, Timeout(self._timeout))
+
+    def _check_reader(self):
+        """Raise SerialException when no more data can be received"""
+        if not self._read_buffer and (self._thread is None or not self._thread.is_alive()):
+            raise SerialException('connection failed (reader thread died)')
 
     def write(self, data):
         """\
@@ -631,6 +755,12 @@ class Serial(SerialBase):
         """
         if not self.is_open:
             raise PortNotOpenError()
+        if self._stats is not None:
+            return self._stats.timed_write(len(data), self._write, data)
+        return self._write(data)
+
+    def _write(self, data):
+        """Send data with IAC escaped"""
         with self._write_lock:
             try:
                 self._socket.sendall(to_bytes(data).replace(IAC, IAC_DOUBLED))
@@ -644,8 +774,8 @@ class Serial(SerialBase):
             raise PortNotOpenError()
         self.rfc2217_send_purge(PURGE_RECEIVE_BUFFER)
         # empty read buffer
-        while self._read_buffer.qsize():
-            self._read_buffer.get(False)
+        del self._pushback[:]
+        self._read_buffer.clear()
 
     def reset_output_buffer(self):
         """\
@@ -749,7 +879,7 @@ class Serial(SerialBase):
         try:
             while self.is_open:
                 try:
-                    data = self._socket.recv(1024)
+                    data = self._socket.recv(16384)
                 except socket.timeout:
                     # just need to get out of recv form time to time to check if
                     # still alive
@@ -758,23 +888,31 @@ class Serial(SerialBase):
                     # connection fails -> terminate loop
                     if self.logger:
                         self.logger.debug("socket error in reader thread: {}".format(e))
-                    self._read_buffer.put(None)
                     break
                 if not data:
-                    self._read_buffer.put(None)
                     break  # lost connection
-                for byte in iterbytes(data):
+                received = bytearray()
+                pos = 0
+                while pos < len(data):
                     if mode == M_NORMAL:
-                        # interpret as command or as data
-                        if byte == IAC:
-                            mode = M_IAC_SEEN
-                        else:
+                        # pass runs of data up to the next IAC in one piece
+                        end = data.find(IAC, pos)
+                        if end < 0:
+                            end = len(data)
+                        if end > pos:
                             # store data in read buffer or sub option buffer
                             # depending on state
                             if suboption is not None:
-                                suboption += byte
+                                suboption += data[pos:end]
                             else:
-                                self._read_buffer.put(byte)
+                                received += data[pos:end]
+                            pos = end
+                            continue
+                    byte = data[pos:pos + 1]
+                    pos += 1
+                    if mode == M_NORMAL:
+                        # only IAC gets here
+                        mode = M_IAC_SEEN
                     elif mode == M_IAC_SEEN:
                         if byte == IAC:
                             # interpret as command doubled -> insert character
@@ -782,7 +920,7 @@ class Serial(SerialBase):
                             if suboption is not None:
                                 suboption += IAC
                             else:
-                                self._read_buffer.put(IAC)
+                                received += IAC
                             mode = M_NORMAL
                         elif byte == SB:
                             # sub option start
@@ -791,6 +929,7 @@ class Serial(SerialBase):
                         elif byte == SE:
                             # sub option end -> process it now
                             self._telnet_process_subnegotiation(bytes(suboption))
+                            self._notify_state_changed()
                             suboption = None
                             mode = M_NORMAL
                         elif byte in (DO, DONT, WILL, WONT):
@@ -803,11 +942,30 @@ class Serial(SerialBase):
                             mode = M_NORMAL
                     elif mode == M_NEGOTIATE:  # DO, DONT, WILL, WONT was received, option now following
                         self._telnet_negotiate_option(telnet_command, byte)
+                        self._notify_state_changed()
                         mode = M_NORMAL
+                if received:
+                    self._read_buffer.put(received)
         finally:
+            self._read_buffer.close()
+            self._notify_state_changed()
             if self.logger:
                 self.logger.debug("read thread terminated")
 
+    def _notify_state_changed(self):
+        """Wake up threads in _wait_for(), called by the reader thread"""
+        with self._state_changed:
+            self._state_changed.notify_all()
+
+    def _wait_for(self, predicate, timeout):
+        """\
+        Wait until predicate() is true, the timeout in seconds expired or the
+        connection is lost. Return the last result of predicate().
+        """
+        with self._state_changed:
+            self._state_changed.wait_for(lambda: predicate() or self._read_buffer.closed, timeout)
+            return predicate()
+
     # - incoming telnet commands and options
 
     def _telnet_process_command(self, command):
@@ -876,10 +1034,14 @@ class Serial(SerialBase):
         """Send DO, DONT, WILL, WONT."""
         self._internal_raw_write(IAC + action + option)
 
+    def rfc2217_subnegotiation_message(self, option, value=b''):
+        """Return the message for a subnegotiation of RFC2217 parameters."""
+        value = value.replace(IAC, IAC_DOUBLED)
+        return IAC + SB + COM_PORT_OPTION + option + value + IAC + SE
+
     def rfc2217_send_subnegotiation(self, option, value=b''):
         """Subnegotiation of RFC2217 parameters."""
-        value = value.replace(IAC, IAC_DOUBLED)
-        self._internal_raw_write(IAC + SB + COM_PORT_OPTION + option + value + IAC + SE)
+        self._internal_raw_write(self.rfc2217_subnegotiation_message(option, value))
 
     def rfc2217_send_purge(self, value):
         """\
@@ -923,14 +1085,9 @@ class Serial(SerialBase):
                 self.logger.debug('polling modem state')
             # when it is older, request an update
             self.rfc2217_send_subnegotiation(NOTIFY_MODEMSTATE)
-            timeout = Timeout(self._network_timeout)
-            while not timeout.expired():
-                time.sleep(0.05)    # prevent 100% CPU load
-                # when expiration time is updated, it means that there is a new
-                # value
-                if not self._modemstate_timeout.expired():
-                    break
-            else:
+            # when expiration time is updated, it means that there is a new
+            # value
+            if not self._wait_for(lambda: not self._modemstate_timeout.expired(), self._network_timeout):
                 if self.logger:
                     self.logger.warning('poll for modem state failed')
             # even when there is a timeout, do not generate an error just
@@ -1059,50 +1216,62 @@ class PortManager(object):
 
     # - outgoing data escaping
 
-    def escape(self, data):
+    def escape_bytes(self, data):
         """\
-        This generator function is for the user. All outgoing data has to be
-        properly escaped, so that no IAC character in the data stream messes up
-        the Telnet state machine in the server.
+        All outgoing data has to be properly escaped, so that no IAC
+        character in the data stream messes up the Telnet state machine in
+        the server. Return the escaped data as bytes.
 
-        socket.sendall(escape(data))
+        socket.sendall(escape_bytes(data))
         """
-        for byte in iterbytes(data):
-            if byte == IAC:
-                yield IAC
-                yield IAC
-            else:
-                yield byte
+        return to_bytes(data).replace(IAC, IAC_DOUBLED)
+
+    def escape(self, data):
+        """\
+        This generator function is for the user. It yields the bytes of
+        escape_bytes(data), see there.
+        """
+        for byte in iterbytes(self.escape_bytes(data)):
+            yield byte
 
     # - incoming data filter
 
-    def filter(self, data):
+    def filter_bytes(self, data):
         """\
-        Handle a bunch of incoming bytes. This is a generator. It will yield
-        all characters not of interest for Telnet/RFC 2217.
+        Handle a bunch of incoming bytes. Return the data that is not of
+        interest for Telnet/RFC 2217 as bytes, commands are processed. Runs
+        of data between IAC characters are copied in one piece.
 
         The idea is that the reader thread pushes data from the socket through
         this filter:
 
-        for byte in filter(socket.recv(1024)):
-            # do things like CR/LF conversion/whatever
-            # and write data to the serial port
-            serial.write(byte)
+        serial.write(filter_bytes(socket.recv(1024)))
 
         (socket error handling code left as exercise for the reader)
         """
-        for byte in iterbytes(data):
+        data = to_bytes(data)
+        result = bytearray()
+        pos = 0
+        while pos < len(data):
             if self.mode == M_NORMAL:
-                # interpret as command or as data
-                if byte == IAC:
-                    self.mode = M_IAC_SEEN
-                else:
+                # pass runs of data up to the next IAC in one piece
+                end = data.find(IAC, pos)
+                if end < 0:
+                    end = len(data)
+                if end > pos:
                     # store data in sub option buffer or pass it to our
                     # consumer depending on state
                     if self.suboption is not None:
-                        self.suboption += byte
+                        self.suboption += data[pos:end]
                     else:
-                        yield byte
+                        result += data[pos:end]
+                    pos = end
+                    continue
+            byte = data[pos:pos + 1]
+            pos += 1
+            if self.mode == M_NORMAL:
+                # only IAC gets here
+                self.mode = M_IAC_SEEN
             elif self.mode == M_IAC_SEEN:
                 if byte == IAC:
                     # interpret as command doubled -> insert character
@@ -1110,7 +1279,7 @@ class PortManager(object):
                     if self.suboption is not None:
                         self.suboption += byte
                     else:
-                        yield byte
+                        result += byte
                     self.mode = M_NORMAL
                 elif byte == SB:
                     # sub option start
@@ -1132,6 +1301,15 @@ class PortManager(object):
             elif self.mode == M_NEGOTIATE:  # DO, DONT, WILL, WONT was received, option now following
                 self._telnet_negotiate_option(self.telnet_command, byte)
                 self.mode = M_NORMAL
+        return bytes(result)
+
+    def filter(self, data):
+        """\
+        Handle a bunch of incoming bytes. This is a generator. It will yield
+        all characters not of interest for Telnet/RFC 2217, see filter_bytes().
+        """
+        for byte in iterbytes(self.filter_bytes(data)):
+            yield byte
 
     # - incoming telnet commands and options
 
@@ -313,6 +313,28 @@ TIOCM_DTR_str = struct.pack('I', TIOCM_DTR)
 TIOCSBRK = getattr(termios, 'TIOCSBRK', 0x5427)
 TIOCCBRK = getattr(termios, 'TIOCCBRK', 0x5428)
 
+# with reuse_receive_buffer, read() sizes up to this are received into a
+# reusable per-port buffer
+RECEIVE_BUFFER_MAX = 65536
+
+# maximum number of buffers for a single writev call
+try:
+    IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 16    # minimum required by POSIX
+if IOV_MAX <= 0:
+    IOV_MAX = 16
+
+
+def _byte_view(data):
+    """Return a flat memoryview of a bytes-like object, without copying"""
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        data = to_bytes(data)
+    view = memoryview(data)
+    if not view.c_contiguous:
+        view = memoryview(view.tobytes())
+    return view.cast('B')
+
 
 class Serial(SerialBase, PlatformSpecific):
     """\
@@ -321,6 +343,12 @@ class Serial(SerialBase, PlatformSpecific):
     systems.
     """
 
+    _read_ahead = True
+    # opt-in: read() receives into the buffer that read_view() uses
+    reuse_receive_buffer = False
+    _rx_buffer = None
+    _applied_tty_settings = None
+
     def open(self):
         """\
         Open port with current settings. This may throw a SerialException
@@ -389,6 +417,13 @@ class Serial(SerialBase, PlatformSpecific):
         if self.fd is None:
             raise SerialException("Can only operate on a valid file descriptor")
 
+        # timeouts are implemented with select and do not need a change of
+        # the tty, skip all ioctls when nothing else changed since last time
+        tty_settings = self._tty_settings()
+        if not force_update and tty_settings == self._applied_tty_settings:
+            return
+        self._applied_tty_settings = None
+
         # if exclusive lock is requested, create it before we modify anything else
         if self._exclusive is not None:
             if self._exclusive:
@@ -530,6 +565,18 @@ class Serial(SerialBase, PlatformSpecific):
         if self._rs485_mode is not None:
             self._set_rs485_mode(self._rs485_mode)
 
+        self._applied_tty_settings = tty_settings
+
+    def _tty_settings(self):
+        """Return the settings that _reconfigure_port() applies to the tty"""
+        if self._rs485_mode is not None:
+            rs485_mode = tuple(sorted(vars(self._rs485_mode).items()))
+        else:
+            rs485_mode = None
+        return (self._exclusive, self._baudrate, self._bytesize, self._parity,
+                self._stopbits, self._xonxoff, self._rtscts,
+                self._inter_byte_timeout, rs485_mode)
+
     def close(self):
         """Close port"""
         if self.is_open:
@@ -542,6 +589,7 @@ class Serial(SerialBase, PlatformSpecific):
                 os.close(self.pipe_abort_write_r)
                 self.pipe_abort_read_r, self.pipe_abort_read_w = None, None
                 self.pipe_abort_write_r, self.pipe_abort_write_w = None, None
+            self._applied_tty_settings = None
             self.is_open = False
 
     #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -
@@ -551,7 +599,7 @@ class Serial(SerialBase, PlatformSpecific):
         """Return the number of bytes currently in the input buffer."""
         #~ s = fcntl.ioctl(self.fd, termios.FIONREAD, TIOCM_zero_str)
         s = fcntl.ioctl(self.fd, TIOCINQ, TIOCM_zero_str)
-        return struct.unpack('I', s)[0]
+        return struct.unpack('I', s)[0] + len(self._pushback)
 
     # select based implementation, proved to work on many systems
     def read(self, size=1):
@@ -559,16 +607,31 @@ class Serial(SerialBase, PlatformSpecific):
         Read size bytes from the serial port. If a timeout is set it may
         return less characters as requested. With no timeout it will block
         until the requested number of bytes is read.
+
+        With reuse_receive_buffer set, reads of up to RECEIVE_BUFFER_MAX
+        bytes receive into the buffer that read_view() also uses. Reads on
+        the port must not run concurrently in several threads then.
         """
         if not self.is_open:
             raise PortNotOpenError()
-        read = bytearray()
+        if size <= 0:
+            return bytes()
+        if self.reuse_receive_buffer and size <= RECEIVE_BUFFER_MAX:
+            # receive into the reusable buffer, the only copy is the result
+            view = self._receive_buffer(size)
+            return bytes(view[:self._receive(view)])
+        if self._stats is not None:
+            return self._stats.timed_read(size, self._read, size)
+        return self._read(size)
+
+    def _read(self, size):
+        """Read size bytes with os.read"""
+        read = bytearray(self._read_pushback(size))
         timeout = Timeout(self._timeout)
         while len(read) < size:
             try:
-                ready, _, _ = select.select([self.fd, self.pipe_abort_read_r], [], [], timeout.time_left())
-                if self.pipe_abort_read_r in ready:
-                    os.read(self.pipe_abort_read_r, 1000)
+                aborted, ready = self._wait_read(self._read_wait_time(timeout, len(read)))
+                if aborted:
                     break
                 # If select was used with a timeout, and the timeout occurs, it
                 # returns with empty lists -> thus abort read operation.
@@ -605,6 +668,110 @@ class Serial(SerialBase, PlatformSpecific):
                 break
         return bytes(read)
 
+    def readinto(self, b):
+        """\
+        Read up to len(b) bytes directly into the writable bytes-like object
+        b (e.g. a bytearray or memoryview) and return the number of bytes
+        read. Timeout and cancel_read() behave the same as for read().
+        """
+        if not self.is_open:
+            raise PortNotOpenError()
+        return self._receive(memoryview(b).cast('B'))
+
+    def _receive(self, view):
+        """\
+        Read into the memoryview, counted by the statistics. read(), readinto()
+        and read_view() use it instead of calling each other, so that wrappers
+        like spy:// see each read once.
+        """
+        if self._stats is not None:
+            return self._stats.timed_read(len(view), self._readinto, view)
+        return self._readinto(view)
+
+    def _readinto(self, view):
+        """Read up to len(view) bytes into the memoryview with os.readv"""
+        size = len(view)
+        n = self._readinto_pushback(view)
+        timeout = Timeout(self._timeout)
+        while n < size:
+            try:
+                aborted, ready = self._wait_read(self._read_wait_time(timeout, n))
+                if aborted or not ready:
+                    break   # cancelled, timeout or inter-byte timeout
+                count = os.readv(self.fd, [view[n:]])
+            except OSError as e:
+                # ignore BlockingIOErrors and EINTR. other errors are shown
+                if e.errno not in (errno.EAGAIN, errno.EALREADY, errno.EWOULDBLOCK, errno.EINPROGRESS, errno.EINTR):
+                    raise SerialException(e.errno, f'read failed: {e}')
+            else:
+                if not count:
+                    raise SerialException(
+                        'device reports readiness to read but returned no data '
+                        '(device disconnected or multiple access on port?)')
+                n += count
+            if timeout.expired():
+                break
+        return n
+
+    def read_view(self, size=1):
+        """\
+        Read size bytes like read() but return a memoryview into the reusable
+        receive buffer of the port instead of a new bytes object. The view
+        is only valid until the next read call on this port. Reads on the
+        port must not run concurrently in several threads.
+        """
+        if not self.is_open:
+            raise PortNotOpenError()
+        view = self._receive_buffer(max(size, 0))
+        return view[:self._receive(view)]
+
+    def _receive_buffer(self, size):
+        """Return a memoryview of size bytes of the reusable receive buffer"""
+        if self._rx_buffer is None or len(self._rx_buffer) < size:
+            # allocate a new buffer instead of resizing the old one as views
+            # returned by read_view() may still be in use
+            self._rx_buffer = bytearray(max(size, min(2 * len(self._rx_buffer or b''), RECEIVE_BUFFER_MAX)))
+        return memoryview(self._rx_buffer)[:size]
+
+    def _read_wait_time(self, timeout, received):
+        """\
+        Return the time in seconds to wait for more data, None blocks. Once
+        some data is received, it is limited by the inter_byte_timeout.
+        """
+        time_left = timeout.time_left()
+        if received and self._inter_byte_timeout:
+            if time_left is None or time_left > self._inter_byte_timeout:
+                return self._inter_byte_timeout
+        return time_left
+
+    def _readinto_pushback(self, view):
+        """Copy data read ahead by read_until() into view, return the count"""
+        data = self._read_pushback(len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    def _wait_read(self, timeout):
+        """\
+        Wait until the port is ready to read or cancel_read() was called.
+        Return a tuple (aborted, ready). timeout is in seconds, None blocks.
+        """
+        ready, _, _ = select.select([self.fd, self.pipe_abort_read_r], [], [], timeout)
+        if self.pipe_abort_read_r in ready:
+            os.read(self.pipe_abort_read_r, 1000)
+            return True, False
+        return False, bool(ready)
+
+    def _wait_write(self, timeout):
+        """\
+        Wait until the port is ready to write or cancel_write() was called.
+        Return a tuple (aborted, ready). timeout is in seconds, None blocks.
+        """
+        abort, ready, _ = select.select([self.pipe_abort_write_r], [self.fd], [], timeout)
+        if abort:
+            os.read(self.pipe_abort_write_r, 1000)
+            return True, False
+        return False, bool(ready)
+
     def cancel_read(self):
         if self.is_open:
             os.write(self.pipe_abort_read_w, b"x")
@@ -617,55 +784,64 @@ class Serial(SerialBase, PlatformSpecific):
         """Output the given byte string over the serial port."""
         if not self.is_open:
             raise PortNotOpenError()
-        d = to_bytes(data)
-        tx_len = length = len(d)
+        view = _byte_view(data)
+        if self._stats is not None:
+            return self._stats.timed_write(view.nbytes, self._write_views, [view])
+        return self._write_views([view])
+
+    def writev(self, buffers):
+        """\
+        Output a sequence of bytes-like objects (e.g. header, payload and CRC)
+        with os.writev, without concatenating them first. Timeouts and
+        cancel_write() behave the same as for write().
+        """
+        if not self.is_open:
+            raise PortNotOpenError()
+        views = [_byte_view(data) for data in buffers]
+        if self._stats is not None:
+            return self._stats.timed_write(sum(view.nbytes for view in views), self._write_views, views)
+        return self._write_views(views)
+
+    def _write_views(self, views):
+        """\
+        Write the given memoryviews, advancing through them on partial writes.
+        Return the number of bytes written.
+        """
+        views = [view for view in views if view.nbytes]
+        written = 0
         timeout = Timeout(self._write_timeout)
-        while tx_len > 0:
+        while views:
             try:
-                n = os.write(self.fd, d)
-                if timeout.is_non_blocking:
-                    # Zero timeout indicates non-blocking - simply return the
-                    # number of bytes of data actually written
-                    return n
-                elif not timeout.is_infinite:
-                    # when timeout is set, use select to wait for being ready
-                    # with the time left as timeout
-                    if timeout.expired():
-                        raise SerialTimeoutException('Write timeout')
-                    abort, ready, _ = select.select([self.pipe_abort_write_r], [self.fd], [], timeout.time_left())
-                    if abort:
-                        os.read(self.pipe_abort_write_r, 1000)
-                        break
-                    if not ready:
-                        raise SerialTimeoutException('Write timeout')
-                else:
-                    assert timeout.time_left() is None
-                    # wait for write operation
-                    abort, ready, _ = select.select([self.pipe_abort_write_r], [self.fd], [], None)
-                    if abort:
-                        os.read(self.pipe_abort_write_r, 1)
-                        break
-                    if not ready:
-                        raise SerialException('write failed (select)')
-                d = d[n:]
-                tx_len -= n
-            except SerialException:
-                raise
+                n = os.writev(self.fd, views[:IOV_MAX])
             except OSError as e:
-                # this is for Python 3.x where select.error is a subclass of
-                # OSError ignore BlockingIOErrors and EINTR. other errors are shown
-                # https://peps.python.org/pep-0475/.
+                # ignore BlockingIOErrors and EINTR. other errors are shown
                 if e.errno not in (errno.EAGAIN, errno.EALREADY, errno.EWOULDBLOCK, errno.EINPROGRESS, errno.EINTR):
                     raise SerialException(e.errno, f'write failed: {e}')
-            except select.error as e:
-                # this is for Python 2.x
-                # ignore BlockingIOErrors and EINTR. all errors are shown
-                # see also https://peps.python.org/pep-3151/#select
-                if e[0] not in (errno.EAGAIN, errno.EALREADY, errno.EWOULDBLOCK, errno.EINPROGRESS, errno.EINTR):
-                    raise SerialException('write failed: {}'.format(e))
-            if not timeout.is_non_blocking and timeout.expired():
+                n = 0
+            written += n
+            # drop the buffers that were sent completely, slice a partial one
+            done = 0
+            while n and n >= views[done].nbytes:
+                n -= views[done].nbytes
+                done += 1
+            del views[:done]
+            if n:
+                views[0] = views[0][n:]
+            if timeout.is_non_blocking or not views:
+                # Zero timeout indicates non-blocking - simply return the
+                # number of bytes of data actually written
+                break
+            if timeout.expired():
+                raise SerialTimeoutException('Write timeout')
+            # wait until the port is ready again, with the time left as timeout
+            aborted, ready = self._wait_write(timeout.time_left())
+            if aborted:
+                break
+            if not ready:
+                if timeout.is_infinite:
+                    raise SerialException('write failed (select)')
                 raise SerialTimeoutException('Write timeout')
-        return length - len(d)
+        return written
 
     def flush(self):
         """\
@@ -680,7 +856,13 @@ class Serial(SerialBase, PlatformSpecific):
         """
         if not self.is_open:
             raise PortNotOpenError()
+        if self._stats is not None:
+            self._stats.timed_flush(self._flush)
+        else:
+            self._flush()
 
+    def _flush(self):
+        """Wait until all data is written (tcdrain), see flush()"""
         # On macOS, tcdrain() can block indefinitely on PTY devices.
         # See: https://github.com/pyserial/pyserial/issues/625
         #      https://github.com/python/cpython/issues/97001
@@ -722,6 +904,7 @@ class Serial(SerialBase, PlatformSpecific):
 
     def _reset_input_buffer(self):
         """Clear input buffer, discarding all that is in the buffer."""
+        del self._pushback[:]
         termios.tcflush(self.fd, termios.TCIFLUSH)
 
     def reset_input_buffer(self):
@@ -859,7 +1042,7 @@ class PosixPollSerial(Serial):
         """
         if not self.is_open:
             raise PortNotOpenError()
-        read = bytearray()
+        read = bytearray(self._read_pushback(size))
         timeout = Timeout(self._timeout)
         poll = select.poll()
         poll.register(self.fd, select.POLLIN | select.POLLERR | select.POLLHUP | select.POLLNVAL)
@@ -868,7 +1051,9 @@ class PosixPollSerial(Serial):
             while len(read) < size:
                 # wait until device becomes ready to read (or something fails)
                 abort = False
-                for fd, event in poll.poll(None if timeout.is_infinite else (timeout.time_left() * 1000)):
+                buf = b''
+                wait_time = self._read_wait_time(timeout, len(read))
+                for fd, event in poll.poll(None if wait_time is None else (wait_time * 1000)):
                     if fd == self.pipe_abort_read_r:
                         os.read(fd, 1000)
                         abort = True
@@ -884,6 +1069,96 @@ class PosixPollSerial(Serial):
                     break   # early abort on timeout
         return bytes(read)
 
+    def _readinto(self, view):
+        """Read up to len(view) bytes into the memoryview, waiting with poll"""
+        size = len(view)
+        n = self._readinto_pushback(view)
+        timeout = Timeout(self._timeout)
+        poll = select.poll()
+        poll.register(self.fd, select.POLLIN | select.POLLERR | select.POLLHUP | select.POLLNVAL)
+        poll.register(self.pipe_abort_read_r, select.POLLIN | select.POLLERR | select.POLLHUP | select.POLLNVAL)
+        while n < size:
+            # wait until device becomes ready to read (or something fails)
+            count = 0
+            wait_time = self._read_wait_time(timeout, n)
+            for fd, event in poll.poll(None if wait_time is None else (wait_time * 1000)):
+                if fd == self.pipe_abort_read_r:
+                    os.read(fd, 1000)
+                    return n
+                if event & (select.POLLERR | select.POLLHUP | select.POLLNVAL):
+                    raise SerialException('device reports error (poll)')
+                count = os.readv(fd, [view[n:]])
+                n += count
+            if timeout.expired() \
+                    or (self._inter_byte_timeout is not None and self._inter_byte_timeout > 0) and not count:
+                break   # early abort on timeout
+        return n
+
+
+class PosixEpollSerial(Serial):
+    """\
+    Epoll based implementation (Linux only). The sets of file descriptors to
+    wait on are created once when the port is opened and are reused for all
+    read and write calls, instead of being set up again on every call.
+
+    Reading and writing use separate epoll objects so that a reader thread
+    and a writer thread do not see each other's events.
+    """
+
+    _epoll_read = None
+    _epoll_write = None
+
+    def open(self):
+        """\
+        Open port with current settings. This may throw a SerialException
+        if the port cannot be opened."""
+        if not hasattr(select, 'epoll'):
+            raise NotImplementedError('epoll is not supported on this platform')
+        super(PosixEpollSerial, self).open()
+        try:
+            self._epoll_read = select.epoll(2)
+            self._epoll_read.register(self.fd, select.EPOLLIN)
+            self._epoll_read.register(self.pipe_abort_read_r, select.EPOLLIN)
+            self._epoll_write = select.epoll(2)
+            self._epoll_write.register(self.fd, select.EPOLLOUT)
+            self._epoll_write.register(self.pipe_abort_write_r, select.EPOLLIN)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Close port"""
+        for epoll in (self._epoll_read, self._epoll_write):
+            if epoll is not None:
+                epoll.close()
+        self._epoll_read = None
+        self._epoll_write = None
+        super(PosixEpollSerial, self).close()
+
+    def _wait_read(self, timeout):
+        """\
+        Wait until the port is ready to read or cancel_read() was called.
+        Return a tuple (aborted, ready). timeout is in seconds, None blocks.
+        """
+        events = self._epoll_read.poll(timeout)
+        for fd, _ in events:
+            if fd == self.pipe_abort_read_r:
+                os.read(self.pipe_abort_read_r, 1000)
+                return True, False
+        return False, bool(events)
+
+    def _wait_write(self, timeout):
+        """\
+        Wait until the port is ready to write or cancel_write() was called.
+        Return a tuple (aborted, ready). timeout is in seconds, None blocks.
+        """
+        events = self._epoll_write.poll(timeout)
+        for fd, _ in events:
+            if fd == self.pipe_abort_write_r:
+                os.read(self.pipe_abort_write_r, 1000)
+                return True, False
+        return False, bool(events)
+
 
 class VTIMESerial(Serial):
     """\
@@ -935,7 +1210,7 @@ class VTIMESerial(Serial):
         """
         if not self.is_open:
             raise PortNotOpenError()
-        read = bytearray()
+        read = bytearray(self._read_pushback(size))
         while len(read) < size:
             buf = os.read(self.fd, size - len(read))
             if not buf:
@@ -943,5 +1218,15 @@ class VTIMESerial(Serial):
             read.extend(buf)
         return bytes(read)
 
+    def _readinto(self, view):
+        """Read up to len(view) bytes into the memoryview, VMIN/VTIME apply"""
+        n = self._readinto_pushback(view)
+        while n < len(view):
+            count = os.readv(self.fd, [view[n:]])
+            if not count:
+                break
+            n += count
+        return n
+
     # hack to make hasattr return false
     cancel_read = property()
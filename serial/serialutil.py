@@ -9,6 +9,7 @@
 
 from __future__ import absolute_import
 
+import contextlib
 import io
 import time
 
@@ -162,6 +163,156 @@ class Timeout(object):
         self.target_time = self.TIME() + duration
 
 
+class LatencyHistogram(object):
+    """\
+    Histogram of durations in nanoseconds with logarithmic buckets, each
+    power of two is split into 16 linear sub-buckets (similar to HDR
+    histograms), so values are kept with a precision of about 6%.
+    """
+
+    SUB_BUCKET_BITS = 4
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Remove all recorded values"""
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value):
+        """Add a value (integer nanoseconds)"""
+        shift = max(0, value.bit_length() - self.SUB_BUCKET_BITS - 1)
+        bucket = (shift << self.SUB_BUCKET_BITS) + (value >> shift)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def _bucket_value(self, bucket):
+        """Return the highest value that is recorded in the given bucket"""
+        shift = max(0, (bucket >> self.SUB_BUCKET_BITS) - 1)
+        mantissa = bucket - (shift << self.SUB_BUCKET_BITS)
+        return ((mantissa + 1) << shift) - 1
+
+    def percentile(self, percent):
+        """Return the value below which percent of the recorded values are"""
+        if not self.count:
+            return None
+        rank = max(1, self.count * percent / 100.0)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._bucket_value(bucket), self.max)
+        return self.max
+
+    def summary(self):
+        """Return a dictionary with count, min, mean, max and percentiles in seconds"""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'min': self.min * 1e-9,
+            'mean': self.total * 1e-9 / self.count,
+            'p50': self.percentile(50) * 1e-9,
+            'p90': self.percentile(90) * 1e-9,
+            'p99': self.percentile(99) * 1e-9,
+            'p99.9': self.percentile(99.9) * 1e-9,
+            'max': self.max * 1e-9,
+        }
+
+
+class PortStatistics(object):
+    """\
+    I/O counters and latency histograms of a port, see
+    SerialBase.enable_stats(). Backends call the timed_*() methods to run
+    and record an operation.
+    """
+
+    OPERATIONS = ('read', 'write', 'flush')
+
+    def __init__(self):
+        self.latency = dict((operation, LatencyHistogram()) for operation in self.OPERATIONS)
+        self.reset()
+
+    def reset(self):
+        """Set all counters to zero and clear the histograms"""
+        self.reads = 0
+        self.bytes_read = 0
+        self.short_reads = 0
+        self.writes = 0
+        self.bytes_written = 0
+        self.partial_writes = 0
+        self.write_timeouts = 0
+        self.flushes = 0
+        for histogram in self.latency.values():
+            histogram.reset()
+
+    def timed_read(self, size, function, *args):
+        """\
+        Call function and record a read of size bytes. The result is the
+        data or the number of bytes read (readinto).
+        """
+        start = time.perf_counter_ns()
+        try:
+            result = function(*args)
+        finally:
+            self.latency['read'].record(time.perf_counter_ns() - start)
+        count = result if isinstance(result, int) else len(result)
+        self.reads += 1
+        self.bytes_read += count
+        if count < size:
+            self.short_reads += 1
+        return result
+
+    def timed_write(self, size, function, *args):
+        """Call function and record a write of size bytes"""
+        start = time.perf_counter_ns()
+        try:
+            count = function(*args)
+        except SerialTimeoutException:
+            self.write_timeouts += 1
+            raise
+        finally:
+            self.latency['write'].record(time.perf_counter_ns() - start)
+        self.writes += 1
+        self.bytes_written += count
+        if count < size:
+            self.partial_writes += 1
+        return count
+
+    def timed_flush(self, function, *args):
+        """Call function and record a flush"""
+        start = time.perf_counter_ns()
+        try:
+            return function(*args)
+        finally:
+            self.latency['flush'].record(time.perf_counter_ns() - start)
+            self.flushes += 1
+
+    def snapshot(self):
+        """Return the counters and latency summaries as dictionary"""
+        return {
+            'reads': self.reads,
+            'bytes_read': self.bytes_read,
+            'short_reads': self.short_reads,
+            'writes': self.writes,
+            'bytes_written': self.bytes_written,
+            'partial_writes': self.partial_writes,
+            'write_timeouts': self.write_timeouts,
+            'flushes': self.flushes,
+            'latency': dict((operation, histogram.summary())
+                            for operation, histogram in self.latency.items()),
+        }
+
+
 class SerialBase(io.RawIOBase):
     """\
     Serial port base class. Provides __init__ function and properties to
@@ -177,6 +328,10 @@ class SerialBase(io.RawIOBase):
     PARITIES = (PARITY_NONE, PARITY_EVEN, PARITY_ODD, PARITY_MARK, PARITY_SPACE)
     STOPBITS = (STOPBITS_ONE, STOPBITS_ONE_POINT_FIVE, STOPBITS_TWO)
 
+    # set by backends whose read() serves _read_pushback() first, only then
+    # read_until() reads ahead of the terminator
+    _read_ahead = False
+
     def __init__(self,
                  port=None,
                  baudrate=9600,
@@ -221,6 +376,13 @@ class SerialBase(io.RawIOBase):
         self._dtr_state = True
         self._break_state = False
         self._exclusive = None
+        # bytes that read_until() read past the terminator, served first by read()
+        self._pushback = bytearray()
+        # settings_transaction() nesting level and pending reconfiguration
+        self._transaction_depth = 0
+        self._transaction_changed = False
+        # PortStatistics when enabled with enable_stats()
+        self._stats = None
 
         # assign values using get/set methods using the properties feature
         self.port = port
@@ -299,8 +461,7 @@ class SerialBase(io.RawIOBase):
             if b < 0:
                 raise ValueError("Not a valid baudrate: {!r}".format(baudrate))
             self._baudrate = b
-            if self.is_open:
-                self._reconfigure_port()
+            self._settings_changed()
 
     @property
     def bytesize(self):
@@ -313,8 +474,7 @@ class SerialBase(io.RawIOBase):
         if bytesize not in self.BYTESIZES:
             raise ValueError("Not a valid byte size: {!r}".format(bytesize))
         self._bytesize = bytesize
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     @property
     def exclusive(self):
@@ -325,8 +485,7 @@ class SerialBase(io.RawIOBase):
     def exclusive(self, exclusive):
         """Change the exclusive access setting."""
         self._exclusive = exclusive
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     @property
     def parity(self):
@@ -339,8 +498,7 @@ class SerialBase(io.RawIOBase):
         if parity not in self.PARITIES:
             raise ValueError("Not a valid parity: {!r}".format(parity))
         self._parity = parity
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     @property
     def stopbits(self):
@@ -353,8 +511,7 @@ class SerialBase(io.RawIOBase):
         if stopbits not in self.STOPBITS:
             raise ValueError("Not a valid stop bit size: {!r}".format(stopbits))
         self._stopbits = stopbits
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     @property
     def timeout(self):
@@ -372,8 +529,7 @@ class SerialBase(io.RawIOBase):
             if timeout < 0:
                 raise ValueError("Not a valid timeout: {!r}".format(timeout))
         self._timeout = timeout
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     @property
     def write_timeout(self):
@@ -392,8 +548,7 @@ class SerialBase(io.RawIOBase):
                 raise ValueError("Not a valid timeout: {!r}".format(timeout))
 
         self._write_timeout = timeout
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     @property
     def inter_byte_timeout(self):
@@ -412,8 +567,7 @@ class SerialBase(io.RawIOBase):
                 raise ValueError("Not a valid timeout: {!r}".format(ic_timeout))
 
         self._inter_byte_timeout = ic_timeout
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     @property
     def xonxoff(self):
@@ -424,8 +578,7 @@ class SerialBase(io.RawIOBase):
     def xonxoff(self, xonxoff):
         """Change XON/XOFF setting."""
         self._xonxoff = xonxoff
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     @property
     def rtscts(self):
@@ -436,8 +589,7 @@ class SerialBase(io.RawIOBase):
     def rtscts(self, rtscts):
         """Change RTS/CTS flow control setting."""
         self._rtscts = rtscts
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     @property
     def dsrdtr(self):
@@ -453,8 +605,7 @@ class SerialBase(io.RawIOBase):
         else:
             # if defined independently, follow its value
             self._dsrdtr = dsrdtr
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     @property
     def rts(self):
@@ -500,8 +651,7 @@ class SerialBase(io.RawIOBase):
     @rs485_mode.setter
     def rs485_mode(self, rs485_settings):
         self._rs485_mode = rs485_settings
-        if self.is_open:
-            self._reconfigure_port()
+        self._settings_changed()
 
     #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -
 
@@ -520,11 +670,65 @@ class SerialBase(io.RawIOBase):
         """\
         Apply stored settings from a dictionary returned from
         get_settings(). It's allowed to delete keys from the dictionary. These
-        values will simply left unchanged.
+        values will simply left unchanged. The port is reconfigured at most
+        once.
+        """
+        with self.settings_transaction():
+            for key in self._SAVED_SETTINGS:
+                if key in d and d[key] != getattr(self, '_' + key):   # check against internal "_" value
+                    setattr(self, key, d[key])          # set non "_" value to use properties write function
+
+    @contextlib.contextmanager
+    def settings_transaction(self):
+        """\
+        Context manager that collects changes of port settings and applies
+        them with a single reconfiguration of the port when the (outermost)
+        block is left, also when it is left with an exception.
+        """
+        self._transaction_depth += 1
+        try:
+            yield self
+        finally:
+            self._transaction_depth -= 1
+            if not self._transaction_depth and self._transaction_changed:
+                self._transaction_changed = False
+                if self.is_open:
+                    self._reconfigure_port()
+
+    def _settings_changed(self):
+        """Reconfigure an open port, or defer it while in settings_transaction()"""
+        if self._transaction_depth:
+            self._transaction_changed = True
+        elif self.is_open:
+            self._reconfigure_port()
+
+    #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -
+
+    def enable_stats(self, enable=True):
+        """\
+        Enable or disable collecting I/O statistics. Enabling starts with
+        cleared counters, enabling them again while they are enabled keeps
+        the counters, see reset_stats(). Supported by the POSIX Serial class,
+        rfc2217:// and socket://, other backends do not record anything.
+        """
+        if not enable:
+            self._stats = None
+        elif self._stats is None:
+            self._stats = PortStatistics()
+
+    def stats(self):
+        """\
+        Return a snapshot of the I/O statistics as dictionary or None if
+        they are not enabled.
         """
-        for key in self._SAVED_SETTINGS:
-            if key in d and d[key] != getattr(self, '_' + key):   # check against internal "_" value
-                setattr(self, key, d[key])          # set non "_" value to use properties write function
+        if self._stats is None:
+            return None
+        return self._stats.snapshot()
+
+    def reset_stats(self):
+        """Clear the I/O statistics"""
+        if self._stats is not None:
+            self._stats.reset()
 
     #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -
 
@@ -561,6 +765,9 @@ class SerialBase(io.RawIOBase):
             b[:n] = array.array('b', data)
         return n
 
+    def readline(self, size=-1):
+        return self.read_until(LF, None if size is None or size < 0 else size)
+
     def close(self):
         # Do not call RawIOBase.close() as that will try to flush().
         pass
@@ -665,19 +872,39 @@ class SerialBase(io.RawIOBase):
         """
         return self.read(self.in_waiting)
 
+    def writev(self, buffers):
+        """\
+        Write a sequence of bytes-like objects (e.g. header, payload and CRC)
+        in one call. Return the number of bytes written.
+        """
+        return self.write(b''.join(buffers))
+
     def read_until(self, expected=LF, size=None):
         """\
         Read until an expected sequence is found (line feed by default), the size
         is exceeded or until timeout occurs.
+
+        Data is read in chunks of what is currently available. Bytes that were
+        received after the expected sequence are kept and returned by the next
+        read() call. Backends that do not support this are read byte by byte.
         """
         lenterm = len(expected)
         line = bytearray()
         timeout = Timeout(self._timeout)
         while True:
-            c = self.read(1)
+            n = (self.in_waiting or 1) if self._read_ahead else 1
+            if size is not None:
+                n = min(n, size - len(line))
+            c = self.read(n)
             if c:
+                # the terminator may span the boundary to the previous chunk
+                start = max(0, len(line) - lenterm + 1)
                 line += c
-                if line[-lenterm:] == expected:
+                pos = line.find(expected, start) if lenterm else -1
+                if pos >= 0:
+                    end = pos + lenterm
+                    self._pushback[:0] = line[end:]
+                    del line[end:]
                     break
                 if size is not None and len(line) >= size:
                     break
@@ -687,6 +914,16 @@ class SerialBase(io.RawIOBase):
                 break
         return bytes(line)
 
+    def _read_pushback(self, size):
+        """\
+        Remove and return up to size bytes that read_until() has read ahead.
+        Backends call this at the start of read() so that no data is lost and
+        set _read_ahead to enable it.
+        """
+        data = bytes(self._pushback[:size])
+        del self._pushback[:size]
+        return data
+
     def iread_until(self, *args, **kwargs):
         """\
         Read lines, implemented as generator. It will raise StopIteration on
@@ -26,6 +26,8 @@ class Serial(SerialBase):
     BAUDRATES = (50, 75, 110, 134, 150, 200, 300, 600, 1200, 1800, 2400, 4800,
                  9600, 19200, 38400, 57600, 115200)
 
+    _read_ahead = True
+
     def __init__(self, *args, **kwargs):
         self._port_handle = None
         self._overlapped_read = None
@@ -257,7 +259,7 @@ class Serial(SerialBase):
         comstat = win32.COMSTAT()
         if not win32.ClearCommError(self._port_handle, ctypes.byref(flags), ctypes.byref(comstat)):
             raise SerialException("ClearCommError failed ({!r})".format(ctypes.WinError()))
-        return comstat.cbInQue
+        return comstat.cbInQue + len(self._pushback)
 
     def read(self, size=1):
         """\
@@ -267,6 +269,8 @@ class Serial(SerialBase):
         """
         if not self.is_open:
             raise PortNotOpenError()
+        pushback = self._read_pushback(size)
+        size -= len(pushback)
         if size > 0:
             win32.ResetEvent(self._overlapped_read.hEvent)
             flags = win32.DWORD()
@@ -298,7 +302,7 @@ class Serial(SerialBase):
                 read = bytes()
         else:
             read = bytes()
-        return bytes(read)
+        return pushback + bytes(read)
 
     def write(self, data):
         """Output the given byte string over the serial port."""
@@ -352,6 +356,7 @@ class Serial(SerialBase):
         """Clear input buffer, discarding all that is in the buffer."""
         if not self.is_open:
             raise PortNotOpenError()
+        del self._pushback[:]
         win32.PurgeComm(self._port_handle, win32.PURGE_RXCLEAR | win32.PURGE_RXABORT)
 
     def reset_output_buffer(self):
@@ -11,8 +11,13 @@ Support threading with serial ports.
 """
 from __future__ import absolute_import
 
+import binascii
+import collections
+import selectors
 import serial
+import socket
 import threading
+import traceback
 
 
 class Protocol(object):
@@ -45,6 +50,13 @@ class Packetizer(Protocol):
     """
 
     TERMINATOR = b'\0'
+    # when not None, data without TERMINATOR beyond this size is discarded
+    MAX_BUFFER_SIZE = None
+    # pass memoryview slices of the buffer to handle_packet instead of copies.
+    # the views are only valid until handle_packet returns.
+    PACKET_VIEWS = False
+    # set when handle_packet failed and the buffer may hold complete packets
+    _rescan = False
 
     def __init__(self):
         self.buffer = bytearray()
@@ -61,15 +73,46 @@ class Packetizer(Protocol):
 
     def data_received(self, data):
         """Buffer received data, find TERMINATOR, call handle_packet"""
+        terminator = self.TERMINATOR
+        # only the new data (and a terminator that may span it) needs a search
+        start = 0 if self._rescan else max(0, len(self.buffer) - len(terminator) + 1)
         self.buffer.extend(data)
-        while self.TERMINATOR in self.buffer:
-            packet, self.buffer = self.buffer.split(self.TERMINATOR, 1)
-            self.handle_packet(packet)
+        end = self.buffer.find(terminator, start)
+        self._rescan = False
+        if end != -1:
+            pos = 0
+            packets = memoryview(self.buffer) if self.PACKET_VIEWS else self.buffer
+            try:
+                while end != -1:
+                    # a packet counts as processed even if handle_packet fails
+                    start, pos = pos, end + len(terminator)
+                    self.handle_packet(packets[start:end])
+                    end = self.buffer.find(terminator, pos)
+            finally:
+                self._rescan = end != -1
+                if self.PACKET_VIEWS:
+                    packets.release()
+                # remove the processed packets at once
+                try:
+                    del self.buffer[:pos]
+                except BufferError:
+                    # a view of a packet is still referenced, keep it intact
+                    self.buffer = self.buffer[pos:]
+        if self.MAX_BUFFER_SIZE is not None and len(self.buffer) > self.MAX_BUFFER_SIZE:
+            data = bytes(self.buffer)
+            self.buffer = bytearray()
+            self.handle_overflow(data)
 
     def handle_packet(self, packet):
         """Process packets - to be overridden by subclassing"""
         raise NotImplementedError('please implement functionality in handle_packet')
 
+    def handle_overflow(self, data):
+        """\
+        Process data that exceeded MAX_BUFFER_SIZE without a TERMINATOR. The
+        data is discarded by default.
+        """
+
 
 class FramedPacket(Protocol):
     """
@@ -98,18 +141,49 @@ class FramedPacket(Protocol):
         super(FramedPacket, self).connection_lost(exc)
 
     def data_received(self, data):
-        """Find data enclosed in START/STOP, call handle_packet"""
-        for byte in serial.iterbytes(data):
-            if byte == self.START:
-                self.in_packet = True
-            elif byte == self.STOP:
+        """\
+        Find data enclosed in START/STOP, call handle_packet. Data between
+        packets is passed in runs to handle_out_of_packet_data.
+        """
+        data = serial.to_bytes(data)
+        pos = 0
+        end = len(data)
+        # positions of the next START/STOP at or after pos, -1 if there is none
+        next_start = data.find(self.START)
+        next_stop = data.find(self.STOP)
+        while pos < end:
+            if next_start != -1 and next_start < pos:
+                next_start = data.find(self.START, pos)
+            if next_stop != -1 and next_stop < pos:
+                next_stop = data.find(self.STOP, pos)
+            if self.in_packet:
+                # START markers within a packet are dropped
+                body = data[pos:end if next_stop == -1 else next_stop]
+                self.packet.extend(body.replace(self.START, b'') if self.START in body else body)
+                if next_stop == -1:
+                    break
                 self.in_packet = False
                 self.handle_packet(bytes(self.packet)) # make read-only copy
                 del self.packet[:]
-            elif self.in_packet:
-                self.packet.extend(byte)
+                pos = next_stop + len(self.STOP)
             else:
-                self.handle_out_of_packet_data(byte)
+                if next_start == -1 or (next_stop != -1 and next_stop < next_start):
+                    marker = next_stop
+                else:
+                    marker = next_start
+                if marker == -1:
+                    self.handle_out_of_packet_data(data[pos:])
+                    break
+                if marker > pos:
+                    self.handle_out_of_packet_data(data[pos:marker])
+                if marker == next_start:
+                    self.in_packet = True
+                    pos = marker + len(self.START)
+                else:
+                    # STOP without START: an empty packet
+                    self.handle_packet(bytes(self.packet))
+                    del self.packet[:]
+                    pos = marker + len(self.STOP)
 
     def handle_packet(self, packet):
         """Process packets - to be overridden by subclassing"""
@@ -131,7 +205,7 @@ class LineReader(Packetizer):
     UNICODE_HANDLING = 'replace'
 
     def handle_packet(self, packet):
-        self.handle_line(packet.decode(self.ENCODING, self.UNICODE_HANDLING))
+        self.handle_line(str(packet, self.ENCODING, self.UNICODE_HANDLING))
 
     def handle_line(self, line):
         """Process one line - to be overridden by subclassing"""
@@ -150,6 +224,215 @@ class LineReader(Packetizer):
         self.transport.flush()
 
 
+class _FramingProtocol(Protocol):
+    """\
+    Base class of the binary framing protocols below. It keeps track of the
+    transport and handles the optional CRC at the end of each frame.
+    """
+
+    # None, 'crc16' (CRC-16/CCITT-FALSE, big endian) or 'crc32' (as zlib, little endian)
+    CRC = None
+    # when not None, larger frames are passed to handle_invalid_packet
+    MAX_PACKET_SIZE = None
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.transport = None
+
+    def connection_made(self, transport):
+        """Store transport"""
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        """Forget transport"""
+        self.transport = None
+        del self.buffer[:]
+        super(_FramingProtocol, self).connection_lost(exc)
+
+    def _crc(self, data):
+        if self.CRC == 'crc16':
+            return binascii.crc_hqx(data, 0xffff).to_bytes(2, 'big')
+        elif self.CRC == 'crc32':
+            return binascii.crc32(data).to_bytes(4, 'little')
+        elif self.CRC is None:
+            return b''
+        raise ValueError('unknown CRC: {!r}'.format(self.CRC))
+
+    def _add_crc(self, payload):
+        payload = serial.to_bytes(payload)
+        return payload + self._crc(payload)
+
+    def _deliver(self, frame):
+        """Verify and strip the CRC of a decoded frame, call handle_packet"""
+        if self.CRC is not None:
+            crc_size = 2 if self.CRC == 'crc16' else 4
+            payload = frame[:-crc_size]
+            if len(frame) < crc_size or frame[-crc_size:] != self._crc(payload):
+                self.handle_invalid_packet(frame)
+                return
+            frame = payload
+        self.handle_packet(frame)
+
+    def write_packet(self, payload):
+        """Encode payload (with CRC if enabled) and write it to the transport"""
+        self.transport.write(self.encode(self._add_crc(payload)))
+
+    def encode(self, frame):
+        """Return the framed data for a frame - to be overridden"""
+        raise NotImplementedError('please implement functionality in encode')
+
+    def handle_packet(self, packet):
+        """Process packets - to be overridden by subclassing"""
+        raise NotImplementedError('please implement functionality in handle_packet')
+
+    def handle_invalid_packet(self, data):
+        """\
+        Process frames with a CRC mismatch, an encoding error or exceeding
+        MAX_PACKET_SIZE. The data is discarded by default.
+        """
+
+
+class LengthPrefixedPacketizer(_FramingProtocol):
+    """\
+    Read binary packets that start with a header containing the number of
+    bytes that follow (payload and CRC).
+    """
+
+    HEADER_SIZE = 2
+    BYTEORDER = 'big'
+
+    def data_received(self, data):
+        """Buffer received data, call handle_packet for each complete packet"""
+        self.buffer.extend(data)
+        buffer = self.buffer
+        pos = 0
+        while len(buffer) - pos >= self.HEADER_SIZE:
+            start = pos + self.HEADER_SIZE
+            length = int.from_bytes(buffer[pos:start], self.BYTEORDER)
+            if self.MAX_PACKET_SIZE is not None and length > self.MAX_PACKET_SIZE:
+                # there is no way to find the next packet, drop everything
+                data = bytes(buffer)
+                del buffer[:]
+                self.handle_invalid_packet(data)
+                return
+            if len(buffer) - start < length:
+                break
+            pos = start + length
+            self._deliver(bytes(buffer[start:pos]))
+        del buffer[:pos]
+
+    def encode(self, frame):
+        """Prefix the frame with its length"""
+        return len(frame).to_bytes(self.HEADER_SIZE, self.BYTEORDER) + frame
+
+
+class _DelimitedFraming(_FramingProtocol):
+    """Base class for framings that end frames with a DELIMITER byte"""
+
+    DELIMITER = b'\0'
+
+    def data_received(self, data):
+        """Buffer received data, decode frames, call handle_packet"""
+        start = len(self.buffer)
+        self.buffer.extend(data)
+        buffer = self.buffer
+        pos = 0
+        end = buffer.find(self.DELIMITER, start)
+        while end != -1:
+            # empty frames, e.g. from a leading delimiter, are ignored
+            if end > pos:
+                self._decode_frame(bytes(buffer[pos:end]))
+            pos = end + 1
+            end = buffer.find(self.DELIMITER, pos)
+        del buffer[:pos]
+        if self.MAX_PACKET_SIZE is not None and len(buffer) > self.MAX_PACKET_SIZE:
+            data = bytes(buffer)
+            del buffer[:]
+            self.handle_invalid_packet(data)
+
+    def _decode_frame(self, frame):
+        if self.MAX_PACKET_SIZE is not None and len(frame) > self.MAX_PACKET_SIZE:
+            self.handle_invalid_packet(frame)
+            return
+        try:
+            decoded = self.decode(frame)
+        except ValueError:
+            self.handle_invalid_packet(frame)
+        else:
+            self._deliver(decoded)
+
+    def decode(self, frame):
+        """Return the payload of a frame, raise ValueError if invalid"""
+        raise NotImplementedError('please implement functionality in decode')
+
+
+class SlipPacketizer(_DelimitedFraming):
+    """\
+    Read and write binary packets with SLIP framing (RFC 1055).
+    """
+
+    DELIMITER = END = b'\xc0'
+    ESC = b'\xdb'
+    ESC_END = b'\xdc'
+    ESC_ESC = b'\xdd'
+
+    def encode(self, frame):
+        """Escape the frame and enclose it in END bytes"""
+        return b''.join((
+            self.END,
+            frame.replace(self.ESC, self.ESC + self.ESC_ESC).replace(self.END, self.ESC + self.ESC_END),
+            self.END))
+
+    def decode(self, frame):
+        """Unescape a frame"""
+        if self.ESC in frame:
+            escaped_end = self.ESC + self.ESC_END
+            escaped_esc = self.ESC + self.ESC_ESC
+            if frame.count(self.ESC) != frame.count(escaped_end) + frame.count(escaped_esc):
+                raise ValueError('invalid SLIP escape sequence')
+            frame = frame.replace(escaped_end, self.END).replace(escaped_esc, self.ESC)
+        return frame
+
+
+class CobsPacketizer(_DelimitedFraming):
+    """\
+    Read and write binary packets with Consistent Overhead Byte Stuffing,
+    frames are terminated with a null byte.
+    """
+
+    DELIMITER = b'\0'
+
+    def encode(self, frame):
+        """COBS encode the frame and append the delimiter"""
+        encoded = bytearray()
+        for block in frame.split(b'\0'):
+            pos = 0
+            # runs of 254 non-zero bytes have no implicit zero at the end
+            while len(block) - pos >= 254:
+                encoded.append(0xff)
+                encoded += block[pos:pos + 254]
+                pos += 254
+            encoded.append(len(block) - pos + 1)
+            encoded += block[pos:]
+        encoded += self.DELIMITER
+        return bytes(encoded)
+
+    def decode(self, frame):
+        """Decode a COBS frame (without delimiter)"""
+        decoded = bytearray()
+        pos = 0
+        end = len(frame)
+        while pos < end:
+            code = frame[pos]
+            if code == 0 or pos + code > end:
+                raise ValueError('invalid COBS code')
+            decoded += frame[pos + 1:pos + code]
+            pos += code
+            if code != 0xff and pos < end:
+                decoded.append(0)
+        return bytes(decoded)
+
+
 class ReaderThread(threading.Thread):
     """\
     Implement a serial port read loop and dispatch to a Protocol instance (like
@@ -157,9 +440,17 @@ class ReaderThread(threading.Thread):
 
     Calls to close() will close the serial port but it is also possible to just
     stop() this thread and continue the serial port instance otherwise.
+
+    With a queue_size (in bytes), received data is put in a queue and the
+    protocol is called from a separate thread, or from tasks submitted to the
+    given concurrent.futures executor, so that slow handlers do not stall
+    reading. overflow selects what happens when the queue is full: 'block'
+    (stop reading), 'drop-oldest' or 'drop-newest'.
     """
 
-    def __init__(self, serial_instance, protocol_factory):
+    OVERFLOW_POLICIES = ('block', 'drop-oldest', 'drop-newest')
+
+    def __init__(self, serial_instance, protocol_factory, queue_size=None, overflow='block', executor=None):
         """\
         Initialize thread.
 
@@ -167,6 +458,12 @@ class ReaderThread(threading.Thread):
         Other settings are not changed.
         """
         super(ReaderThread, self).__init__()
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError('overflow must be one of {!r}, not {!r}'.format(self.OVERFLOW_POLICIES, overflow))
+        if queue_size is not None and queue_size < 1:
+            raise ValueError('queue_size must be positive: {!r}'.format(queue_size))
+        if executor is not None and queue_size is None:
+            raise ValueError('executor requires a queue_size')
         self.daemon = True
         self.serial = serial_instance
         self.protocol_factory = protocol_factory
@@ -174,12 +471,26 @@ class ReaderThread(threading.Thread):
         self._lock = threading.Lock()
         self._connection_made = threading.Event()
         self.protocol = None
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.executor = executor
+        # counters (in bytes)
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.dropped_bytes = 0
+        self._queue = collections.deque()
+        self._queue_changed = threading.Condition()
+        self._reading = False
+        self._dispatching = False
+        self._dispatch_error = None
 
     def stop(self):
         """Stop the reader thread"""
         self.alive = False
         if hasattr(self.serial, 'cancel_read'):
             self.serial.cancel_read()
+        with self._queue_changed:
+            self._queue_changed.notify_all()
         self.join(2)
 
     def run(self):
@@ -196,6 +507,13 @@ class ReaderThread(threading.Thread):
             return
         error = None
         self._connection_made.set()
+        if self.queue_size is not None:
+            self._reading = True
+            if self.executor is None:
+                self._dispatching = True
+                dispatcher = threading.Thread(target=self._dispatch, args=(True,))
+                dispatcher.daemon = True
+                dispatcher.start()
         while self.alive and self.serial.is_open:
             try:
                 # read all that is there or wait for one byte (blocking)
@@ -207,16 +525,82 @@ class ReaderThread(threading.Thread):
                 break
             else:
                 if data:
+                    if self.queue_size is not None:
+                        self._queue_data(data)
+                        continue
                     # make a separated try-except for called user code
                     try:
                         self.protocol.data_received(data)
                     except Exception as e:
                         error = e
                         break
+        if self.queue_size is not None:
+            # let the dispatcher deliver the queued data (unless stopped)
+            with self._queue_changed:
+                self._reading = False
+                self._queue_changed.notify_all()
+                while self._dispatching:
+                    self._queue_changed.wait()
+            if self._dispatch_error is not None:
+                error = self._dispatch_error
         self.alive = False
         self.protocol.connection_lost(error)
         self.protocol = None
 
+    def _queue_data(self, data):
+        """Put received data in the queue, applying the overflow policy"""
+        with self._queue_changed:
+            if self._queue and self.queue_depth + len(data) > self.queue_size:
+                if self.overflow == 'block':
+                    while self._queue and self.queue_depth + len(data) > self.queue_size:
+                        if not self.alive or self._dispatch_error is not None:
+                            break
+                        self._queue_changed.wait()
+                elif self.overflow == 'drop-newest':
+                    self.dropped_bytes += len(data)
+                    return
+                else:
+                    while self._queue and self.queue_depth + len(data) > self.queue_size:
+                        dropped = self._queue.popleft()
+                        self.queue_depth -= len(dropped)
+                        self.dropped_bytes += len(dropped)
+            self._queue.append(data)
+            self.queue_depth += len(data)
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            if self.executor is not None and not self._dispatching:
+                self._dispatching = True
+                self.executor.submit(self._dispatch, False)
+            else:
+                self._queue_changed.notify_all()
+
+    def _dispatch(self, wait):
+        """\
+        Pass queued data to the protocol. Returns when the queue is empty, or
+        when reading has ended if wait is true.
+        """
+        while True:
+            with self._queue_changed:
+                while wait and self._reading and not self._queue and self.alive:
+                    self._queue_changed.wait()
+                if not self._queue or not self.alive or self._dispatch_error is not None:
+                    self._dispatching = False
+                    self._queue_changed.notify_all()
+                    return
+                data = self._queue.popleft()
+                self.queue_depth -= len(data)
+                self._queue_changed.notify_all()
+            # make a separated try-except for called user code
+            try:
+                self.protocol.data_received(data)
+            except Exception as e:
+                with self._queue_changed:
+                    self._dispatch_error = e
+                    self._queue.clear()
+                    self.queue_depth = 0
+                self.alive = False
+                if hasattr(self.serial, 'cancel_read'):
+                    self.serial.cancel_read()
+
     def write(self, data):
         """Thread safe writing (uses lock)"""
         with self._lock:
@@ -266,13 +650,220 @@ class ReaderThread(threading.Thread):
         self.close()
 
 
+class HubConnection(object):
+    """\
+    A serial port that is served by a ReaderHub. It is the transport that is
+    passed to Protocol.connection_made and provides the same methods as
+    ReaderThread for that purpose (write, flush, close).
+    """
+
+    def __init__(self, hub, serial_instance, protocol_factory):
+        self.hub = hub
+        self.serial = serial_instance
+        self.protocol_factory = protocol_factory
+        self.protocol = None
+        self.alive = True
+        self._fd = None
+        self._lock = threading.Lock()
+        self._connection_made = threading.Event()
+        self._removed = threading.Event()
+
+    def write(self, data):
+        """Thread safe writing (uses lock)"""
+        with self._lock:
+            return self.serial.write(data)
+
+    def flush(self):
+        """Flush the underlying transport"""
+        with self._lock:
+            self.serial.flush()
+
+    def stop(self):
+        """Remove the port from the hub, the serial port is not closed"""
+        if threading.current_thread() is self.hub:
+            self._remove(None)
+        else:
+            self.hub._call_soon(self._remove, None)
+            self._removed.wait(2)
+
+    def close(self):
+        """Remove the port from the hub and close it (uses lock)"""
+        self.stop()
+        # use the lock to let other threads finish writing
+        with self._lock:
+            self.serial.close()
+
+    def connect(self):
+        """\
+        Wait until the connection is set up and return the transport and
+        protocol instances.
+        """
+        if self.alive:
+            self._connection_made.wait()
+            if not self.alive:
+                raise RuntimeError('connection_lost already called')
+            return (self, self.protocol)
+        else:
+            raise RuntimeError('already stopped')
+
+    # - - - called in the hub thread
+
+    def _start(self):
+        """Create the protocol and register the port"""
+        self.protocol = self.protocol_factory()
+        try:
+            self.protocol.connection_made(self)
+            # read whatever is there, the selector tells when data is ready
+            self.serial.timeout = 0
+            self._fd = self.serial.fileno()
+            self.hub._selector.register(self._fd, selectors.EVENT_READ, self)
+        except Exception as e:
+            self._remove(e)
+        self._connection_made.set()
+
+    def _read_ready(self):
+        """Read what is available and pass it to the protocol"""
+        try:
+            data = self.serial.read(self.serial.in_waiting or 1)
+        except serial.SerialException as e:
+            # probably some I/O problem such as disconnected USB serial
+            # adapters -> remove this port
+            self._remove(e)
+        else:
+            if data:
+                # make a separated try-except for called user code
+                try:
+                    self.protocol.data_received(data)
+                except Exception as e:
+                    self._remove(e)
+
+    def _remove(self, error):
+        """Unregister the port and call connection_lost"""
+        if not self.alive:
+            return
+        self.alive = False
+        self.hub._connections.discard(self)
+        if self._fd is not None:
+            self.hub._selector.unregister(self._fd)
+            self._fd = None
+        if self.protocol is not None:
+            try:
+                self.protocol.connection_lost(error)
+            except Exception:
+                # an error of one port must not stop the others, report it
+                # like an unhandled exception in a thread
+                traceback.print_exc()
+            self.protocol = None
+        self._connection_made.set()
+        self._removed.set()
+
+
+class ReaderHub(threading.Thread):
+    """\
+    Implement the read loops of any number of serial ports in a single thread,
+    using a selector, and dispatch to Protocol instances (like ReaderThread
+    does for a single port). The ports must support fileno() (e.g. POSIX).
+
+    Ports are added with add(), which returns the transport of the port.
+    """
+
+    def __init__(self):
+        super(ReaderHub, self).__init__()
+        self.daemon = True
+        self.alive = True
+        self._selector = selectors.DefaultSelector()
+        self._calls = collections.deque()
+        self._connections = set()
+        # a socket pair is used to wake up the thread for calls from outside
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+
+    def add(self, serial_instance, protocol_factory):
+        """\
+        Serve the (opened) serial_instance with a protocol from
+        protocol_factory. Returns a HubConnection, its connect() method
+        waits until the connection is set up.
+
+        Note that the serial_instance's timeout is set to zero!
+        """
+        connection = HubConnection(self, serial_instance, protocol_factory)
+        self._connections.add(connection)
+        self._call_soon(connection._start)
+        return connection
+
+    @property
+    def connections(self):
+        """List of the connections that are currently served"""
+        return [connection for connection in list(self._connections) if connection.alive]
+
+    def stop(self):
+        """Stop the hub thread, connection_lost is called for all ports"""
+        self.alive = False
+        self._wakeup()
+        self.join(2)
+
+    def close(self):
+        """Stop the hub thread and close all serial ports"""
+        connections = list(self._connections)
+        self.stop()
+        for connection in connections:
+            connection.close()
+
+    def run(self):
+        """Reader loop"""
+        try:
+            while self.alive:
+                while self._calls:
+                    function, args = self._calls.popleft()
+                    function(*args)
+                for key, _ in self._selector.select():
+                    if key.data is None:
+                        try:
+                            while self._wakeup_r.recv(4096):
+                                pass
+                        except BlockingIOError:
+                            pass
+                    else:
+                        key.data._read_ready()
+        finally:
+            self.alive = False
+            for connection in list(self._connections):
+                connection._remove(None)
+            self._selector.close()
+            self._wakeup_r.close()
+            self._wakeup_w.close()
+
+    def _call_soon(self, function, *args):
+        """Run function in the hub thread"""
+        self._calls.append((function, args))
+        self._wakeup()
+
+    def _wakeup(self):
+        try:
+            self._wakeup_w.send(b'x')
+        except (BlockingIOError, OSError):
+            pass    # already woken up or closed
+
+    # - -  context manager
+
+    def __enter__(self):
+        """Start the hub thread"""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Leave context: close all ports"""
+        self.close()
+
+
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 # test
 if __name__ == '__main__':
     # pylint: disable=wrong-import-position
     import sys
     import time
-    import traceback
 
     #~ PORT = 'spy:///dev/ttyUSB0'
     PORT = 'loop://'
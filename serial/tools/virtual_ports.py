@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+#
+# Virtual serial ports based on pseudo terminals (Posix).
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+
+"""\
+Create virtual serial ports with pseudo terminals. Each VirtualPort is a pty
+pair, applications (in any process) open the slave device with its ``name``
+and the master side is connected to something else by a Pump: another
+virtual port (null modem), a socket of a device simulator or a Unix socket
+that simulators connect to.
+
+This is an alternative to ``socat pty,raw pty,raw`` for tests.
+"""
+
+import argparse
+import os
+import pty
+import selectors
+import socket
+import sys
+import threading
+import tty
+
+
+class VirtualPort(object):
+    """\
+    A pseudo terminal pair in raw mode. ``name`` is the path of the slave
+    device that is opened with serial.Serial, ``master`` the file descriptor
+    of the other side.
+    """
+
+    def __init__(self):
+        self.master, self.slave = pty.openpty()
+        # no echo, line editing or CR/LF translation for clients that do not
+        # configure the port. The slave stays open here so that the pty is
+        # kept while clients open and close it.
+        tty.setraw(self.slave)
+        self.name = os.ttyname(self.slave)
+
+    def fileno(self):
+        """Return the file descriptor (int) of the master side"""
+        return self.master
+
+    def close(self):
+        """Close both sides of the pty"""
+        if self.master is not None:
+            os.close(self.master)
+            os.close(self.slave)
+            self.master = self.slave = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.name)
+
+
+def create(count=1):
+    """Create count virtual ports, return a list of VirtualPort objects"""
+    ports = []
+    try:
+        for _ in range(count):
+            ports.append(VirtualPort())
+    except OSError:
+        for port in ports:
+            port.close()
+        raise
+    return ports
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+def _fileno(obj):
+    return obj if isinstance(obj, int) else obj.fileno()
+
+
+class _Direction(object):
+    """Data that is copied from one file descriptor to another"""
+
+    def __init__(self, src, dst):
+        self.src = src
+        self.dst = dst
+        self.pending = memoryview(b'')
+
+
+class _Connection(object):
+    def __init__(self, a, b, owned):
+        self.a = a
+        self.b = b
+        # objects that are closed when the connection ends
+        self.owned = owned
+        fd_a = _fileno(a)
+        fd_b = _fileno(b)
+        self.directions = (_Direction(fd_a, fd_b), _Direction(fd_b, fd_a))
+
+
+class Pump(object):
+    """\
+    Copy data in both directions between pairs of file descriptors (virtual
+    ports, sockets, pipes) from a single thread. Data is passed in chunks of
+    up to bufsize (int) bytes. The file descriptors are switched to non-blocking
+    mode, a full receiver only stalls its own direction.
+
+    A connection ends when one side reports end of file, e.g. when the
+    simulator closes its socket. Virtual ports never end a connection, their
+    slave side is kept open.
+    """
+
+    def __init__(self, bufsize=65536):
+        self.bufsize = bufsize
+        self.alive = False
+        self._connections = []
+        self._listeners = {}
+        self._commands = []
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector()
+        self._registered = {}
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        self._registered[self._wakeup_r] = selectors.EVENT_READ
+        self._thread = None
+
+    def _command(self, function, *args):
+        """Run function in the pump thread"""
+        with self._lock:
+            self._commands.append((function, args))
+        os.write(self._wakeup_w, b'x')
+
+    def connect(self, a, b):
+        """\
+        Copy data between a and b in both directions. Both are file
+        descriptors or objects with a fileno() method, e.g. a VirtualPort
+        and a connected socket.
+        """
+        for obj in (a, b):
+            os.set_blocking(_fileno(obj), False)
+        self._command(self._connections.append, _Connection(a, b, ()))
+
+    def listen(self, port, path):
+        """\
+        Accept connections on a Unix socket at path (str) and connect them
+        to port, a VirtualPort. A new connection replaces the previous one.
+        """
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(path)
+            listener.listen(1)
+        except OSError:
+            listener.close()
+            raise
+        listener.setblocking(False)
+        os.set_blocking(_fileno(port), False)
+        self._command(self._listeners.__setitem__, listener.fileno(), (listener, port, path))
+
+    def start(self):
+        """Start the thread that copies the data"""
+        self.alive = True
+        self._thread = threading.Thread(target=self._run, name='virtual ports pump')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop the thread, close accepted connections and listening sockets"""
+        if self._thread is not None:
+            self._command(setattr, self, 'alive', False)
+            self._thread.join()
+            self._thread = None
+        else:
+            # never started, apply connect() and listen() for the cleanup
+            for function, args in self._commands:
+                function(*args)
+        self._commands = []
+        for connection in self._connections:
+            for obj in connection.owned:
+                obj.close()
+        self._connections = []
+        for listener, _, path in self._listeners.values():
+            listener.close()
+            os.unlink(path)
+        self._listeners = {}
+        self._selector.close()
+        os.close(self._wakeup_r)
+        os.close(self._wakeup_w)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.stop()
+
+    # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+    def _update_selector(self, wanted):
+        for fd in list(self._registered):
+            if fd not in wanted:
+                self._selector.unregister(fd)
+                del self._registered[fd]
+        for fd, events in wanted.items():
+            if fd not in self._registered:
+                self._selector.register(fd, events)
+            elif self._registered[fd] != events:
+                self._selector.modify(fd, events)
+            self._registered[fd] = events
+
+    def _accept(self, fd):
+        listener, port, _ = self._listeners[fd]
+        try:
+            sock, _ = listener.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        for connection in self._connections:
+            if connection.a is port and connection.owned:
+                self._end(connection)
+                break
+        self._connections.append(_Connection(port, sock, (sock,)))
+
+    def _end(self, connection):
+        self._connections.remove(connection)
+        for obj in connection.owned:
+            # unregister before the file descriptor number can be reused
+            fd = obj.fileno()
+            if fd in self._registered:
+                self._selector.unregister(fd)
+                del self._registered[fd]
+            obj.close()
+
+    def _transfer(self, direction, readable):
+        """Move data of one _Direction, return False at end of file"""
+        if not direction.pending and readable:
+            try:
+                data = os.read(direction.src, self.bufsize)
+            except BlockingIOError:
+                return True
+            except OSError:
+                return False
+            if not data:
+                return False
+            direction.pending = memoryview(data)
+        if direction.pending:
+            try:
+                n = os.write(direction.dst, direction.pending)
+            except BlockingIOError:
+                n = 0
+            except OSError:
+                return False
+            direction.pending = direction.pending[n:]
+        return True
+
+    def _run(self):
+        while True:
+            with self._lock:
+                commands, self._commands = self._commands, []
+            for function, args in commands:
+                function(*args)
+            if not self.alive:
+                break
+            wanted = {self._wakeup_r: selectors.EVENT_READ}
+            for fd in self._listeners:
+                wanted[fd] = selectors.EVENT_READ
+            for connection in self._connections:
+                for direction in connection.directions:
+                    if direction.pending:
+                        wanted[direction.dst] = wanted.get(direction.dst, 0) | selectors.EVENT_WRITE
+                    else:
+                        wanted[direction.src] = wanted.get(direction.src, 0) | selectors.EVENT_READ
+            self._update_selector(wanted)
+            ready = {key.fd: events for key, events in self._selector.select()}
+            if self._wakeup_r in ready:
+                try:
+                    os.read(self._wakeup_r, 1024)
+                except BlockingIOError:
+                    pass
+            for fd in ready:
+                if fd in self._listeners:
+                    self._accept(fd)
+            for connection in list(self._connections):
+                for direction in connection.directions:
+                    if direction.src in ready or direction.dst in ready:
+                        readable = bool(ready.get(direction.src, 0) & selectors.EVENT_READ)
+                        if not self._transfer(direction, readable):
+                            self._end(connection)
+                            break
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+def main():
+    parser = argparse.ArgumentParser(
+        description='Create virtual serial ports (pseudo terminals) for tests.')
+
+    parser.add_argument(
+        '-n', '--count',
+        type=int,
+        default=2,
+        help='number of virtual ports (default: %(default)s)')
+
+    group = parser.add_mutually_exclusive_group(required=True)
+
+    group.add_argument(
+        '--null-modem',
+        action='store_true',
+        help='connect the ports pairwise (1st with 2nd, 3rd with 4th, ...)')
+
+    group.add_argument(
+        '--socket-dir',
+        metavar='DIR',
+        help='connect each port to a Unix socket DIR/<n> that simulators connect to')
+
+    args = parser.parse_args()
+
+    if args.null_modem and args.count % 2:
+        parser.error('--null-modem needs an even number of ports')
+
+    ports = create(args.count)
+    pump = Pump()
+    try:
+        if args.null_modem:
+            for a, b in zip(ports[::2], ports[1::2]):
+                pump.connect(a, b)
+                sys.stdout.write('{} <-> {}\n'.format(a.name, b.name))
+        else:
+            for n, port in enumerate(ports):
+                path = os.path.join(args.socket_dir, str(n))
+                pump.listen(port, path)
+                sys.stdout.write('{} <-> {}\n'.format(port.name, path))
+        sys.stdout.flush()
+        with pump:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for port in ports:
+            port.close()
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+# test
+if __name__ == '__main__':
+    main()
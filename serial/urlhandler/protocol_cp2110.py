@@ -66,6 +66,8 @@ class Serial(SerialBase):
                  38400, 57600, 115200, 230400, 460800, 500000, 576000,
                  921600, 1000000)
 
+    _read_ahead = True
+
     def __init__(self, *args, **kwargs):
         self._hid_handle = None
         self._read_buffer = None
@@ -181,7 +183,7 @@ class Serial(SerialBase):
 
     @property
     def in_waiting(self):
-        return self._read_buffer.qsize()
+        return self._read_buffer.qsize() + len(self._pushback)
 
     def reset_input_buffer(self):
         if not self.is_open:
@@ -189,6 +191,7 @@ class Serial(SerialBase):
         self._hid_handle.send_feature_report(
             bytes((_REPORT_SET_PURGE_FIFOS, _PURGE_RX_FIFO)))
         # empty read buffer
+        del self._pushback[:]
         while self._read_buffer.qsize():
             self._read_buffer.get(False)
 
@@ -216,7 +219,7 @@ class Serial(SerialBase):
         if not self.is_open:
             raise PortNotOpenError()
 
-        data = bytearray()
+        data = bytearray(self._read_pushback(size))
         try:
             timeout = Timeout(self._timeout)
             while len(data) < size:
@@ -17,17 +17,14 @@ from __future__ import absolute_import
 
 import logging
 import numbers
-import time
+import threading
 try:
     import urlparse
 except ImportError:
     import urllib.parse as urlparse
-try:
-    import queue
-except ImportError:
-    import Queue as queue
 
-from serial.serialutil import SerialBase, SerialException, to_bytes, iterbytes, SerialTimeoutException, PortNotOpenError
+from serial.serialutil import SerialBase, SerialException, to_bytes, SerialTimeoutException, \
+    PortNotOpenError, Timeout, PARITY_NONE
 
 # map log level names to constants. used in from_url()
 LOGGER_LEVELS = {
@@ -38,15 +35,135 @@ LOGGER_LEVELS = {
 }
 
 
+class Channel(object):
+    """\
+    One direction of a virtual serial link. Received data is kept in a
+    fixed size ring buffer. When char_time (seconds per byte) is set, written
+    data is first kept "in transit" and moved to the ring buffer at the pace
+    given by char_time, this is evaluated lazily by the readers and writers.
+
+    All methods must be called with the condition ``changed`` acquired.
+    Waiting readers and writers are notified through it.
+    """
+
+    def __init__(self, size, transit_size=None):
+        self.changed = threading.Condition()
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._count = 0
+        # paced data that is not yet received
+        self._transit = bytearray()
+        self.transit_size = size if transit_size is None else transit_size
+        self._transit_start = 0.0
+        self.char_time = None
+
+    def _deliver(self):
+        """\
+        Move data that has arrived from transit to the ring buffer. Return
+        the time in seconds until the next byte arrives or None.
+        """
+        if not self._transit:
+            return None
+        now = Timeout.TIME()
+        arrived = min(int((now - self._transit_start) / self.char_time),
+                      len(self._transit),
+                      len(self._buffer) - self._count)
+        if arrived:
+            self._put(memoryview(self._transit)[:arrived])
+            del self._transit[:arrived]
+            self._transit_start += arrived * self.char_time
+            self.changed.notify_all()
+        if not self._transit:
+            return None
+        if self._count == len(self._buffer):
+            # receiver is full, wait for it to read
+            self._transit_start = max(self._transit_start, now - self.char_time)
+            return None
+        return max(0, self._transit_start + self.char_time - now)
+
+    def _put(self, view):
+        """Copy as much as fits of view into the ring buffer, return the count"""
+        size = len(self._buffer)
+        n = min(len(view), size - self._count)
+        end = (self._start + self._count) % size
+        first = min(n, size - end)
+        self._buffer[end:end + first] = view[:first]
+        self._buffer[:n - first] = view[first:n]
+        self._count += n
+        return n
+
+    def in_waiting(self):
+        """Number of bytes that can be read"""
+        self._deliver()
+        return self._count
+
+    def out_waiting(self):
+        """Number of bytes in transit"""
+        self._deliver()
+        return len(self._transit)
+
+    def next_arrival(self):
+        """Time in seconds until more data arrives in the ring buffer or None"""
+        return self._deliver()
+
+    def write(self, view):
+        """Take as much as possible of the memoryview, return the count"""
+        if self.char_time is None:
+            n = self._put(view)
+        else:
+            self._deliver()
+            n = min(len(view), self.transit_size - len(self._transit))
+            if n and not self._transit:
+                self._transit_start = Timeout.TIME()
+            self._transit += view[:n]
+        if n:
+            self.changed.notify_all()
+        return n
+
+    def read(self, size):
+        """Return up to size bytes from the ring buffer"""
+        self._deliver()
+        n = min(size, self._count)
+        if not n:
+            return b''
+        first = min(n, len(self._buffer) - self._start)
+        if first == n:
+            data = bytes(self._view[self._start:self._start + n])
+        else:
+            data = b''.join((self._view[self._start:], self._view[:n - first]))
+        self._count -= n
+        self._start = (self._start + n) % len(self._buffer) if self._count else 0
+        self.changed.notify_all()
+        return data
+
+    def clear_input(self):
+        """Discard received data"""
+        self._deliver()
+        self._start = self._count = 0
+        self.changed.notify_all()
+
+    def clear_output(self):
+        """Discard data in transit"""
+        del self._transit[:]
+        self.changed.notify_all()
+
+
 class Serial(SerialBase):
     """Serial port implementation that simulates a loop back connection in plain software."""
 
     BAUDRATES = (50, 75, 110, 134, 150, 200, 300, 600, 1200, 1800, 2400, 4800,
                  9600, 19200, 38400, 57600, 115200)
 
+    _read_ahead = True
+
     def __init__(self, *args, **kwargs):
         self.buffer_size = 4096
-        self.queue = None
+        self.throttle = False
+        self.emulate_timing = False
+        self.tx_fifo_size = None
+        self._rx = self._tx = None
+        self._cancel_read = False
         self._cancel_write = False
         super(Serial, self).__init__(*args, **kwargs)
 
@@ -57,13 +174,12 @@ class Serial(SerialBase):
         """
         if self.is_open:
             raise SerialException("Port is already open.")
-        self.queue = queue.Queue(self.buffer_size)
-
         if self._port is None:
             raise SerialException("Port must be configured before it can be used.")
         # not that there is anything to open, but the function applies the
         # options found in the URL
         self.from_url(self.port)
+        self._rx, self._tx = self._open_channels()
 
         # not that there anything to configure...
         self._reconfigure_port()
@@ -76,48 +192,90 @@ class Serial(SerialBase):
         self.reset_input_buffer()
         self.reset_output_buffer()
 
+    def _open_channels(self):
+        """Return the channels (rx, tx) of the port, the same one for loop://"""
+        channel = Channel(self.buffer_size, self.tx_fifo_size)
+        return channel, channel
+
+    def _tx_connected(self):
+        """Return False when nobody receives the data written to _tx"""
+        return True
+
     def close(self):
         if self.is_open:
             self.is_open = False
-            try:
-                self.queue.put_nowait(None)
-            except queue.Full:
-                pass
+            # wake up blocked readers and writers
+            with self._rx.changed:
+                self._rx.changed.notify_all()
+            with self._tx.changed:
+                self._tx.changed.notify_all()
         super(Serial, self).close()
 
     def _reconfigure_port(self):
         """\
         Set communication parameters on opened port. For the loop://
-        protocol all settings are ignored!
+        protocol all settings are ignored, except that they set the pace
+        when throttling or timing emulation is enabled.
         """
         # not that's it of any real use, but it helps in the unit tests
         if not isinstance(self._baudrate, numbers.Integral) or not 0 < self._baudrate < 2 ** 32:
             raise ValueError("invalid baudrate: {!r}".format(self._baudrate))
+        if self._tx is not None:
+            with self._tx.changed:
+                self._tx.char_time = self.char_time()
         if self.logger:
             self.logger.info('_reconfigure_port()')
 
+    def char_time(self):
+        """\
+        Return the time in seconds to transmit one byte when the data is
+        paced or None. With emulate_timing, start bit, data bits, parity and
+        stop bits are counted, otherwise 10 bits.
+        """
+        if self.emulate_timing:
+            bits = 1 + self._bytesize + (self._parity != PARITY_NONE) + self._stopbits
+        elif self.throttle:
+            bits = 10
+        else:
+            return None
+        return float(bits) / self._baudrate
+
     def from_url(self, url):
         """extract host and port from an URL string"""
         parts = urlparse.urlsplit(url)
         if parts.scheme != "loop":
             raise SerialException(
                 'expected a string in the form '
-                '"loop://[?logging={debug|info|warning|error}]": not starting '
+                '"loop://[?logging={debug|info|warning|error}][&throttle]'
+                '[&emulate_timing][&tx_fifo=<n>]": not starting '
                 'with loop:// ({!r})'.format(parts.scheme))
         try:
-            # process options now, directly altering self
-            for option, values in urlparse.parse_qs(parts.query, True).items():
-                if option == 'logging':
-                    logging.basicConfig()   # XXX is that good to call it here?
-                    self.logger = logging.getLogger('pySerial.loop')
-                    self.logger.setLevel(LOGGER_LEVELS[values[0]])
-                    self.logger.debug('enabled logging')
-                else:
-                    raise ValueError('unknown option: {!r}'.format(option))
+            self._set_url_options(parts.query, 'pySerial.loop')
         except ValueError as e:
             raise SerialException(
                 'expected a string in the form '
-                '"loop://[?logging={debug|info|warning|error}]": {}'.format(e))
+                '"loop://[?logging={debug|info|warning|error}][&throttle]'
+                '[&emulate_timing][&tx_fifo=<n>]": {}'.format(e))
+
+    def _set_url_options(self, query, logger_name):
+        """Apply the options of the URL query, raise ValueError if invalid"""
+        # process options now, directly altering self
+        for option, values in urlparse.parse_qs(query, True).items():
+            if option == 'logging':
+                logging.basicConfig()   # XXX is that good to call it here?
+                self.logger = logging.getLogger(logger_name)
+                self.logger.setLevel(LOGGER_LEVELS[values[0]])
+                self.logger.debug('enabled logging')
+            elif option == 'throttle':
+                self.throttle = values[0] not in ('0', 'false', 'no')
+            elif option == 'emulate_timing':
+                self.emulate_timing = values[0] not in ('0', 'false', 'no')
+            elif option == 'tx_fifo':
+                self.tx_fifo_size = int(values[0])
+                if self.tx_fifo_size < 1:
+                    raise ValueError('tx_fifo must be positive')
+            else:
+                raise ValueError('unknown option: {!r}'.format(option))
 
     #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -
 
@@ -126,11 +284,11 @@ class Serial(SerialBase):
         """Return the number of bytes currently in the input buffer."""
         if not self.is_open:
             raise PortNotOpenError()
+        with self._rx.changed:
+            n = self._rx.in_waiting()
         if self.logger:
-            # attention the logged value can differ from return value in
-            # threaded environments...
-            self.logger.debug('in_waiting -> {:d}'.format(self.queue.qsize()))
-        return self.queue.qsize()
+            self.logger.debug('in_waiting -> {:d}'.format(n))
+        return n + len(self._pushback)
 
     def read(self, size=1):
         """\
@@ -140,36 +298,45 @@ class Serial(SerialBase):
         """
         if not self.is_open:
             raise PortNotOpenError()
-        if self._timeout is not None and self._timeout != 0:
-            timeout = time.time() + self._timeout
-        else:
-            timeout = None
-        data = bytearray()
-        while size > 0 and self.is_open:
-            try:
-                b = self.queue.get(timeout=self._timeout)  # XXX inter char timeout
-            except queue.Empty:
-                if self._timeout == 0:
+        data = bytearray(self._read_pushback(size))
+        timeout = Timeout(self._timeout)
+        # restarted with each received byte when inter_byte_timeout is set
+        inter_byte = None
+        with self._rx.changed:
+            while len(data) < size and self.is_open:
+                chunk = self._rx.read(size - len(data))
+                if chunk:
+                    data += chunk
+                    if self._inter_byte_timeout is not None and self._inter_byte_timeout > 0:
+                        inter_byte = Timeout(self._inter_byte_timeout)
+                if len(data) >= size:
                     break
-            else:
-                if b is not None:
-                    data += b
-                    size -= 1
-                else:
+                if self._cancel_read:
+                    self._cancel_read = False
+                    break
+                if timeout.expired() or (inter_byte is not None and inter_byte.expired()):
+                    if self.logger:
+                        self.logger.info('read timeout')
                     break
-            # check for timeout now, after data has been read.
-            # useful for timeout = 0 (non blocking) read
-            if timeout and time.time() > timeout:
-                if self.logger:
-                    self.logger.info('read timeout')
-                break
+                self._rx.changed.wait(self._wait_time(
+                    self._rx, timeout, None if inter_byte is None else inter_byte.time_left()))
         return bytes(data)
 
+    @staticmethod
+    def _wait_time(channel, timeout, limit=None):
+        """Return how long to wait for a change of channel, None is forever"""
+        waits = [t for t in (channel.next_arrival(), timeout.time_left(), limit) if t is not None]
+        return min(waits) if waits else None
+
     def cancel_read(self):
-        self.queue.put_nowait(None)
+        with self._rx.changed:
+            self._cancel_read = True
+            self._rx.changed.notify_all()
 
     def cancel_write(self):
-        self._cancel_write = True
+        with self._tx.changed:
+            self._cancel_write = True
+            self._tx.changed.notify_all()
 
     def write(self, data):
         """\
@@ -177,26 +344,47 @@ class Serial(SerialBase):
         connection is blocked. May raise SerialException if the connection is
         closed.
         """
-        self._cancel_write = False
         if not self.is_open:
             raise PortNotOpenError()
-        data = to_bytes(data)
-        # calculate aprox time that would be used to send the data
-        time_used_to_send = 10.0 * len(data) / self._baudrate
-        # when a write timeout is configured check if we would be successful
-        # (not sending anything, not even the part that would have time)
-        if self._write_timeout is not None and time_used_to_send > self._write_timeout:
-            # must wait so that unit test succeeds
-            time_left = self._write_timeout
-            while time_left > 0 and not self._cancel_write:
-                time.sleep(min(time_left, 0.5))
-                time_left -= 0.5
-            if self._cancel_write:
-                return 0  # XXX
-            raise SerialTimeoutException('Write timeout')
-        for byte in iterbytes(data):
-            self.queue.put(byte, timeout=self._write_timeout)
-        return len(data)
+        view = memoryview(to_bytes(data))
+        with self._tx.changed:
+            self._cancel_write = False
+            # calculate aprox time that would be used to send the data
+            time_used_to_send = 10.0 * len(view) / self._baudrate
+            # when a write timeout is configured check if we would be successful
+            # (not sending anything, not even the part that would have time).
+            # non-blocking writes return the number of bytes that fit instead,
+            # paced transmissions time out when the TX FIFO stays full
+            if self._write_timeout and time_used_to_send > self._write_timeout and self._tx.char_time is None:
+                # must wait so that unit test succeeds
+                timeout = Timeout(self._write_timeout)
+                while not timeout.expired() and not self._cancel_write:
+                    self._tx.changed.wait(timeout.time_left())
+                if self._cancel_write:
+                    return 0  # XXX
+                raise SerialTimeoutException('Write timeout')
+            written = 0
+            timeout = Timeout(self._write_timeout)
+            while written < len(view) and self.is_open:
+                if not self._tx_connected():
+                    # nobody receives, the data is lost like on an unconnected line
+                    written = len(view)
+                    break
+                written += self._tx.write(view[written:])
+                if written == len(view) or self._cancel_write or timeout.is_non_blocking:
+                    break
+                if timeout.expired():
+                    raise SerialTimeoutException('Write timeout')
+                self._tx.changed.wait(self._wait_time(self._tx, timeout))
+        return written
+
+    def flush(self):
+        """Wait until all data in transit has been received (when paced)"""
+        if not self.is_open:
+            raise PortNotOpenError()
+        with self._tx.changed:
+            while self.is_open and self._tx.out_waiting():
+                self._tx.changed.wait(self._tx.next_arrival())
 
     def reset_input_buffer(self):
         """Clear input buffer, discarding all that is in the buffer."""
@@ -204,11 +392,9 @@ class Serial(SerialBase):
             raise PortNotOpenError()
         if self.logger:
             self.logger.info('reset_input_buffer()')
-        try:
-            while self.queue.qsize():
-                self.queue.get_nowait()
-        except queue.Empty:
-            pass
+        del self._pushback[:]
+        with self._rx.changed:
+            self._rx.clear_input()
 
     def reset_output_buffer(self):
         """\
@@ -219,22 +405,19 @@ class Serial(SerialBase):
             raise PortNotOpenError()
         if self.logger:
             self.logger.info('reset_output_buffer()')
-        try:
-            while self.queue.qsize():
-                self.queue.get_nowait()
-        except queue.Empty:
-            pass
+        with self._tx.changed:
+            self._tx.clear_output()
 
     @property
     def out_waiting(self):
         """Return how many bytes the in the outgoing buffer"""
         if not self.is_open:
             raise PortNotOpenError()
+        with self._tx.changed:
+            n = self._tx.out_waiting()
         if self.logger:
-            # attention the logged value can differ from return value in
-            # threaded environments...
-            self.logger.debug('out_waiting -> {:d}'.format(self.queue.qsize()))
-        return self.queue.qsize()
+            self.logger.debug('out_waiting -> {:d}'.format(n))
+        return n
 
     def _update_break_state(self):
         """\
@@ -0,0 +1,196 @@
+#! python
+#
+# This module implements pairs of virtual serial ports that are connected to
+# each other, within one process.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+#
+# URL format:    pair://<name>/{a|b}[?option[&option...]]
+# options: the same as for loop://
+from __future__ import absolute_import
+
+import threading
+try:
+    import urlparse
+except ImportError:
+    import urllib.parse as urlparse
+
+from serial.serialutil import SerialException, PortNotOpenError
+from serial.urlhandler import protocol_loop
+
+# name -> _Link, links are removed when both ends are closed
+_links = {}
+_links_lock = threading.Lock()
+
+
+class _Link(object):
+    """The two channels and the open ports of a pair"""
+
+    def __init__(self, size):
+        self.size = size
+        # channels by the end that receives from it
+        self.channels = {'a': protocol_loop.Channel(size), 'b': protocol_loop.Channel(size)}
+        self.ports = {'a': None, 'b': None}
+
+
+class Serial(protocol_loop.Serial):
+    """\
+    One end of a pair of virtual serial ports. The data written to the end
+    "a" is received by "b" and vice versa. The modem lines are connected
+    like in a null modem cable: RTS->CTS, DTR->DSR and DTR->CD.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._link = None
+        self._link_name = None
+        self._end = None
+        super(Serial, self).__init__(*args, **kwargs)
+
+    def from_url(self, url):
+        """extract name and end from an URL string"""
+        parts = urlparse.urlsplit(url)
+        if parts.scheme != "pair":
+            raise SerialException(
+                'expected a string in the form '
+                '"pair://<name>/{{a|b}}[?options]": not starting '
+                'with pair:// ({!r})'.format(parts.scheme))
+        try:
+            if not parts.netloc:
+                raise ValueError('name missing')
+            if parts.path not in ('/a', '/b'):
+                raise ValueError('end must be /a or /b, not {!r}'.format(parts.path))
+            self._set_url_options(parts.query, 'pySerial.pair')
+        except ValueError as e:
+            raise SerialException(
+                'expected a string in the form '
+                '"pair://<name>/{{a|b}}[?options]": {}'.format(e))
+        self._link_name = parts.netloc
+        self._end = parts.path[1:]
+
+    def open(self):
+        """\
+        Open port with current settings. This may throw a SerialException
+        if the end is already open and a ValueError if the buffer_size is not
+        the same as the one of the other end.
+        """
+        if self.is_open:
+            raise SerialException("Port is already open.")
+        try:
+            super(Serial, self).open()
+        except Exception:
+            # e.g. an invalid baudrate, do not keep the end registered
+            if self.is_open:
+                self.close()
+            else:
+                self._unregister()
+            raise
+
+    def _open_channels(self):
+        """Connect to the link of the pair, create it if needed"""
+        with _links_lock:
+            link = _links.get(self._link_name)
+            if link is None:
+                link = _links[self._link_name] = _Link(self.buffer_size)
+            if link.ports[self._end] is not None:
+                raise SerialException('pair://{}/{} is already open'.format(self._link_name, self._end))
+            if link.size != self.buffer_size:
+                raise ValueError('pair://{}/{}: buffer_size {} differs from the other end ({})'.format(
+                    self._link_name, self._end, self.buffer_size, link.size))
+            link.ports[self._end] = self
+        self._link = link
+        tx = link.channels[self._peer_end()]
+        with tx.changed:
+            tx.transit_size = self.tx_fifo_size or self.buffer_size
+        return link.channels[self._end], tx
+
+    def _peer_end(self):
+        return 'b' if self._end == 'a' else 'a'
+
+    def _tx_connected(self):
+        """Data written while the other end is not open is discarded"""
+        return self._peer() is not None
+
+    def _peer(self):
+        """Return the open port of the other end or None"""
+        if self._link is None:
+            return None
+        return self._link.ports[self._peer_end()]
+
+    def _unregister(self):
+        """Release the end, remove the link when the other end is closed too"""
+        if self._link is not None:
+            with _links_lock:
+                self._link.ports[self._end] = None
+                if self._link.ports[self._peer_end()] is None:
+                    del _links[self._link_name]
+            self._link = None
+
+    def close(self):
+        if self.is_open:
+            self._unregister()
+            # drop pending data, a blocked writer of the other end continues
+            with self._rx.changed:
+                self._rx.clear_input()
+                self._rx.clear_output()
+        super(Serial, self).close()
+
+    #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -
+
+    def _update_rts_state(self):
+        """Set terminal status line: Request To Send"""
+        if self.logger:
+            self.logger.info('_update_rts_state({!r}) -> CTS of other end'.format(self._rts_state))
+
+    def _update_dtr_state(self):
+        """Set terminal status line: Data Terminal Ready"""
+        if self.logger:
+            self.logger.info('_update_dtr_state({!r}) -> DSR and CD of other end'.format(self._dtr_state))
+
+    @property
+    def cts(self):
+        """Read terminal status line: Clear To Send, RTS of the other end"""
+        if not self.is_open:
+            raise PortNotOpenError()
+        peer = self._peer()
+        return peer is not None and peer._rts_state
+
+    @property
+    def dsr(self):
+        """Read terminal status line: Data Set Ready, DTR of the other end"""
+        if not self.is_open:
+            raise PortNotOpenError()
+        peer = self._peer()
+        return peer is not None and peer._dtr_state
+
+    @property
+    def ri(self):
+        """Read terminal status line: Ring Indicator"""
+        if not self.is_open:
+            raise PortNotOpenError()
+        return False
+
+    @property
+    def cd(self):
+        """Read terminal status line: Carrier Detect, DTR of the other end"""
+        if not self.is_open:
+            raise PortNotOpenError()
+        peer = self._peer()
+        return peer is not None and peer._dtr_state
+
+
+# simple client test
+if __name__ == '__main__':
+    import sys
+    a = Serial('pair://test/a')
+    b = Serial('pair://test/b', timeout=1)
+    sys.stdout.write('{}\n'.format(a))
+
+    sys.stdout.write("write...\n")
+    a.write(b"hello\n")
+    sys.stdout.write("read: {!r}\n".format(b.read(6)))
+
+    a.close()
+    b.close()
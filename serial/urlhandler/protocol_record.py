@@ -0,0 +1,259 @@
+#! python
+#
+# This module implements a special URL handler that wraps an other port and
+# records the traffic to a binary capture file that replay:// plays back.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+#
+# URL format:    record://port?file=<capture>
+# options:
+# - file=X   the capture file that is written (required)
+#
+# capture file format: the header MAGIC followed by records. Each record is a
+# RECORD header (timestamp in seconds since the port was opened, event,
+# length) followed by length bytes: the data for RX and TX, a single byte
+# 0 or 1 for modem and break lines.
+#
+# example:
+#   python -m serial.tools.miniterm record:///dev/ttyUSB0?file=session.cap
+from __future__ import absolute_import
+
+import struct
+import threading
+import time
+
+import serial
+from serial.serialutil import to_bytes
+try:
+    import urlparse
+except ImportError:
+    import urllib.parse as urlparse
+
+MAGIC = b'pySerial capture 1\n'
+RECORD = struct.Struct('<dBI')
+
+# events
+RX = 1
+TX = 2
+RTS = 3
+DTR = 4
+BREAK = 5
+CTS = 6
+DSR = 7
+RI = 8
+CD = 9
+
+EVENT_NAMES = {
+    RX: 'RX', TX: 'TX', RTS: 'RTS', DTR: 'DTR', BREAK: 'BREAK',
+    CTS: 'CTS', DSR: 'DSR', RI: 'RI', CD: 'CD'}
+
+
+def iter_records(f):
+    """\
+    Yield the records of a capture file that is opened in binary mode as
+    tuples (timestamp, event, data).
+    """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError('not a pySerial capture file')
+    while True:
+        header = f.read(RECORD.size)
+        if not header:
+            break
+        if len(header) < RECORD.size:
+            raise ValueError('capture file is truncated')
+        timestamp, event, length = RECORD.unpack(header)
+        data = f.read(length)
+        if len(data) < length:
+            raise ValueError('capture file is truncated')
+        yield timestamp, event, data
+
+
+class Recorder(object):
+    """Write timestamped records to a capture file, thread safe"""
+
+    def __init__(self, filename):
+        self._file = open(filename, 'wb')
+        self._file.write(MAGIC)
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        # last recorded level of the lines, to record only changes
+        self._levels = {}
+
+    def data(self, event, data):
+        """record RX or TX data"""
+        if data:
+            with self._lock:
+                self._file.write(RECORD.pack(time.monotonic() - self._start, event, len(data)))
+                self._file.write(data)
+
+    def line(self, event, level):
+        """record the level of a modem or break line when it changed"""
+        level = bool(level)
+        with self._lock:
+            if self._levels.get(event) is not level:
+                self._levels[event] = level
+                self._file.write(RECORD.pack(time.monotonic() - self._start, event, 1))
+                self._file.write(b'\x01' if level else b'\x00')
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Serial(serial.Serial):
+    """\
+    Inherit the native Serial port implementation and record the received
+    and transmitted data and the modem line changes.
+    """
+    # pylint: disable=no-member
+
+    def __init__(self, *args, **kwargs):
+        self._capture = None
+        self.recorder = None
+        super(Serial, self).__init__(*args, **kwargs)
+
+    @serial.Serial.port.setter
+    def port(self, value):
+        if value is not None:
+            serial.Serial.port.__set__(self, self.from_url(value))
+
+    def from_url(self, url):
+        """extract port and capture file name from an URL string"""
+        parts = urlparse.urlsplit(url)
+        if parts.scheme != 'record':
+            raise serial.SerialException(
+                'expected a string in the form '
+                '"record://port?file=<capture>": '
+                'not starting with record:// ({!r})'.format(parts.scheme))
+        capture = None
+        try:
+            for option, values in urlparse.parse_qs(parts.query, True).items():
+                if option == 'file':
+                    capture = values[0]
+                else:
+                    raise ValueError('unknown option: {!r}'.format(option))
+            if not capture:
+                raise ValueError('option "file" is required')
+        except ValueError as e:
+            raise serial.SerialException(
+                'expected a string in the form '
+                '"record://port?file=<capture>": {}'.format(e))
+        self._capture = capture
+        return ''.join([parts.netloc, parts.path])
+
+    def open(self):
+        super(Serial, self).open()
+        try:
+            self.recorder = Recorder(self._capture)
+        except OSError as e:
+            super(Serial, self).close()
+            raise serial.SerialException('could not open capture file {!r}: {}'.format(self._capture, e))
+        # the levels the lines start with
+        self.recorder.line(RTS, self._rts_state)
+        self.recorder.line(DTR, self._dtr_state)
+        self.recorder.line(BREAK, self._break_state)
+
+    def close(self):
+        super(Serial, self).close()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def write(self, tx):
+        tx = to_bytes(tx)
+        n = super(Serial, self).write(tx)
+        self.recorder.data(TX, tx[:n])
+        return n
+
+    if serial.Serial.writev is not serial.SerialBase.writev:
+        def writev(self, buffers):
+            buffers = [to_bytes(tx) for tx in buffers]
+            n = super(Serial, self).writev(buffers)
+            self.recorder.data(TX, b''.join(buffers)[:n])
+            return n
+
+    def read(self, size=1):
+        # data read ahead by read_until() was already recorded
+        pushback = len(self._pushback)
+        rx = super(Serial, self).read(size)
+        self.recorder.data(RX, rx[pushback:])
+        return rx
+
+    if serial.Serial.readinto is not serial.SerialBase.readinto:
+        def readinto(self, b):
+            view = memoryview(b).cast('B')
+            pushback = min(len(self._pushback), len(view))
+            n = super(Serial, self).readinto(view)
+            self.recorder.data(RX, bytes(view[pushback:n]))
+            return n
+
+    if hasattr(serial.Serial, 'read_view'):
+        def read_view(self, size=1):
+            pushback = min(len(self._pushback), max(size, 0))
+            view = super(Serial, self).read_view(size)
+            self.recorder.data(RX, bytes(view[pushback:]))
+            return view
+
+    def send_break(self, duration=0.25):
+        if self.recorder is not None:
+            self.recorder.line(BREAK, True)
+        super(Serial, self).send_break(duration)
+        if self.recorder is not None:
+            self.recorder.line(BREAK, False)
+
+    @serial.Serial.break_condition.setter
+    def break_condition(self, level):
+        serial.Serial.break_condition.__set__(self, level)
+        if self.recorder is not None:
+            self.recorder.line(BREAK, level)
+
+    @serial.Serial.rts.setter
+    def rts(self, level):
+        serial.Serial.rts.__set__(self, level)
+        if self.recorder is not None:
+            self.recorder.line(RTS, level)
+
+    @serial.Serial.dtr.setter
+    def dtr(self, level):
+        serial.Serial.dtr.__set__(self, level)
+        if self.recorder is not None:
+            self.recorder.line(DTR, level)
+
+    @serial.Serial.cts.getter
+    def cts(self):
+        level = super(Serial, self).cts
+        if self.recorder is not None:
+            self.recorder.line(CTS, level)
+        return level
+
+    @serial.Serial.dsr.getter
+    def dsr(self):
+        level = super(Serial, self).dsr
+        if self.recorder is not None:
+            self.recorder.line(DSR, level)
+        return level
+
+    @serial.Serial.ri.getter
+    def ri(self):
+        level = super(Serial, self).ri
+        if self.recorder is not None:
+            self.recorder.line(RI, level)
+        return level
+
+    @serial.Serial.cd.getter
+    def cd(self):
+        level = super(Serial, self).cd
+        if self.recorder is not None:
+            self.recorder.line(CD, level)
+        return level
+
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+if __name__ == '__main__':
+    import sys
+    with open(sys.argv[1], 'rb') as f:
+        for timestamp, event, data in iter_records(f):
+            sys.stdout.write('{:010.6f} {:5} {!r}\n'.format(timestamp, EVENT_NAMES.get(event, event), data))
@@ -0,0 +1,250 @@
+#! python
+#
+# This module implements a special URL handler that plays back the received
+# data of a capture file written by record://.
+#
+# This file is part of pySerial. https://github.com/pyserial/pyserial
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+#
+# URL format:    replay://<capture>[?option[&option...]]
+# options:
+# - speed=X    play back X times faster than recorded, "max" delivers all
+#              data immediately. default: 1
+from __future__ import absolute_import
+
+import threading
+try:
+    import urlparse
+except ImportError:
+    import urllib.parse as urlparse
+
+from serial.serialutil import SerialBase, SerialException, to_bytes, PortNotOpenError, Timeout
+from serial.urlhandler import protocol_record
+
+
+class Serial(SerialBase):
+    """\
+    Play back the RX data and modem line changes of a capture file. The
+    timestamps are relative to opening the port, written data is discarded.
+    Reads return early when the end of the capture is reached.
+    """
+
+    _read_ahead = True
+
+    def __init__(self, *args, **kwargs):
+        self.speed = 1.0
+        self._capture = None
+        self._changed = threading.Condition()
+        self._chunks = []       # (timestamp, data) of the RX records
+        self._lines = {}        # event -> [(timestamp, level), ...]
+        self._next = 0          # index of the next chunk to deliver
+        self._buffer = bytearray()
+        self._start = None
+        self._cancel_read = False
+        super(Serial, self).__init__(*args, **kwargs)
+
+    def open(self):
+        """\
+        Open port with current settings. This may throw a SerialException
+        if the capture file cannot be opened.
+        """
+        if self.is_open:
+            raise SerialException("Port is already open.")
+        if self._port is None:
+            raise SerialException("Port must be configured before it can be used.")
+        self.from_url(self.port)
+        chunks = []
+        lines = {}
+        try:
+            with open(self._capture, 'rb') as f:
+                for timestamp, event, data in protocol_record.iter_records(f):
+                    if event == protocol_record.RX:
+                        chunks.append((timestamp, data))
+                    elif event in (protocol_record.CTS, protocol_record.DSR,
+                                   protocol_record.RI, protocol_record.CD):
+                        lines.setdefault(event, []).append((timestamp, data == b'\x01'))
+        except (OSError, ValueError) as e:
+            raise SerialException('could not open capture file {!r}: {}'.format(self._capture, e))
+        self._chunks = chunks
+        self._lines = lines
+        self._next = 0
+        del self._buffer[:]
+        self._start = Timeout.TIME()
+        self.is_open = True
+
+    def close(self):
+        if self.is_open:
+            with self._changed:
+                self.is_open = False
+                self._changed.notify_all()
+        super(Serial, self).close()
+
+    def from_url(self, url):
+        """extract capture file name and options from an URL string"""
+        parts = urlparse.urlsplit(url)
+        if parts.scheme != 'replay':
+            raise SerialException(
+                'expected a string in the form '
+                '"replay://<capture>[?speed=<factor>|max]": not starting '
+                'with replay:// ({!r})'.format(parts.scheme))
+        try:
+            for option, values in urlparse.parse_qs(parts.query, True).items():
+                if option == 'speed':
+                    if values[0] == 'max':
+                        self.speed = None
+                    else:
+                        self.speed = float(values[0])
+                        if not self.speed > 0:
+                            raise ValueError('speed must be positive')
+                else:
+                    raise ValueError('unknown option: {!r}'.format(option))
+        except ValueError as e:
+            raise SerialException(
+                'expected a string in the form '
+                '"replay://<capture>[?speed=<factor>|max]": {}'.format(e))
+        self._capture = ''.join([parts.netloc, parts.path])
+
+    def _reconfigure_port(self):
+        """The settings have no effect on the playback"""
+
+    #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -
+
+    def _replay_time(self):
+        """Return the position in the capture, None when not paced"""
+        if self.speed is None:
+            return None
+        return (Timeout.TIME() - self._start) * self.speed
+
+    def _deliver(self):
+        """\
+        Move the chunks that are due to the buffer. Return the time in
+        seconds until the next chunk is due or None at the end.
+        """
+        now = self._replay_time()
+        while self._next < len(self._chunks):
+            timestamp, data = self._chunks[self._next]
+            if now is not None and timestamp > now:
+                return (timestamp - now) / self.speed
+            self._buffer += data
+            self._next += 1
+        return None
+
+    @property
+    def in_waiting(self):
+        """Return the number of bytes currently in the input buffer."""
+        if not self.is_open:
+            raise PortNotOpenError()
+        with self._changed:
+            self._deliver()
+            return len(self._buffer) + len(self._pushback)
+
+    def read(self, size=1):
+        """\
+        Read size bytes of the capture. If a timeout is set it may return
+        less characters as requested, also at the end of the capture.
+        """
+        if not self.is_open:
+            raise PortNotOpenError()
+        data = bytearray(self._read_pushback(size))
+        timeout = Timeout(self._timeout)
+        with self._changed:
+            while len(data) < size and self.is_open:
+                next_chunk = self._deliver()
+                n = size - len(data)
+                data += self._buffer[:n]
+                del self._buffer[:n]
+                if len(data) >= size:
+                    break
+                if next_chunk is None:
+                    break   # end of capture
+                if self._cancel_read:
+                    break
+                if timeout.expired():
+                    break
+                left = timeout.time_left()
+                self._changed.wait(next_chunk if left is None else min(next_chunk, left))
+            self._cancel_read = False
+        return bytes(data)
+
+    def cancel_read(self):
+        with self._changed:
+            self._cancel_read = True
+            self._changed.notify_all()
+
+    def write(self, data):
+        """Discard the data, the capture does not depend on it"""
+        if not self.is_open:
+            raise PortNotOpenError()
+        return len(to_bytes(data))
+
+    def reset_input_buffer(self):
+        """Clear input buffer, discarding all data that is due."""
+        if not self.is_open:
+            raise PortNotOpenError()
+        del self._pushback[:]
+        with self._changed:
+            self._deliver()
+            del self._buffer[:]
+
+    def reset_output_buffer(self):
+        """Nothing to clear, written data is discarded"""
+        if not self.is_open:
+            raise PortNotOpenError()
+
+    def _update_break_state(self):
+        """Break has no effect on the playback"""
+
+    def _update_rts_state(self):
+        """RTS has no effect on the playback"""
+
+    def _update_dtr_state(self):
+        """DTR has no effect on the playback"""
+
+    def _line(self, event):
+        """\
+        Return the level of an input line at the current position in the
+        capture, the first recorded level before it changed and False if
+        it was never read while recording.
+        """
+        if not self.is_open:
+            raise PortNotOpenError()
+        changes = self._lines.get(event)
+        if not changes:
+            return False
+        now = self._replay_time()
+        level = changes[0][1]
+        for timestamp, value in changes:
+            if now is not None and timestamp > now:
+                break
+            level = value
+        return level
+
+    @property
+    def cts(self):
+        """Read terminal status line: Clear To Send, as recorded"""
+        return self._line(protocol_record.CTS)
+
+    @property
+    def dsr(self):
+        """Read terminal status line: Data Set Ready, as recorded"""
+        return self._line(protocol_record.DSR)
+
+    @property
+    def ri(self):
+        """Read terminal status line: Ring Indicator, as recorded"""
+        return self._line(protocol_record.RI)
+
+    @property
+    def cd(self):
+        """Read terminal status line: Carrier Detect, as recorded"""
+        return self._line(protocol_record.CD)
+
+
+# simple client test
+if __name__ == '__main__':
+    import sys
+    s = Serial('replay://{}?speed=max'.format(sys.argv[1]))
+    sys.stdout.write('{!r}\n'.format(s.read(s.in_waiting)))
+    s.close()
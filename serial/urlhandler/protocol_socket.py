@@ -48,6 +48,8 @@ class Serial(SerialBase):
     BAUDRATES = (50, 75, 110, 134, 150, 200, 300, 600, 1200, 1800, 2400, 4800,
                  9600, 19200, 38400, 57600, 115200)
 
+    _read_ahead = True
+
     def open(self):
         """\
         Open port with current settings. This may throw a SerialException
@@ -139,7 +141,7 @@ class Serial(SerialBase):
         # Poll the socket to see if it is ready for reading.
         # If ready, at least one byte will be to read.
         lr, lw, lx = select.select([self._socket], [], [], 0)
-        return len(lr)
+        return len(lr) + len(self._pushback)
 
     # select based implementation, similar to posix, but only using socket API
     # to be portable, additionally handle socket timeout which is used to
@@ -152,7 +154,13 @@ class Serial(SerialBase):
         """
         if not self.is_open:
             raise PortNotOpenError()
-        read = bytearray()
+        if self._stats is not None:
+            return self._stats.timed_read(size, self._read, size)
+        return self._read(size)
+
+    def _read(self, size):
+        """Read size bytes from the socket, see read()"""
+        read = bytearray(self._read_pushback(size))
         timeout = Timeout(self._timeout)
         while len(read) < size:
             try:
@@ -193,7 +201,12 @@ class Serial(SerialBase):
         """
         if not self.is_open:
             raise PortNotOpenError()
+        if self._stats is not None:
+            return self._stats.timed_write(len(data), self._write, data)
+        return self._write(data)
 
+    def _write(self, data):
+        """Send data to the socket, see write()"""
         d = to_bytes(data)
         tx_len = length = len(d)
         timeout = Timeout(self._write_timeout)
@@ -242,6 +255,7 @@ class Serial(SerialBase):
         """Clear input buffer, discarding all that is in the buffer."""
         if not self.is_open:
             raise PortNotOpenError()
+        del self._pushback[:]
 
         # just use recv to remove input, while there is some
         ready = True
@@ -252,12 +252,37 @@ class Serial(serial.Serial):
         self.formatter.tx(tx)
         return super(Serial, self).write(tx)
 
+    if serial.Serial.writev is not serial.SerialBase.writev:
+        def writev(self, buffers):
+            buffers = [to_bytes(tx) for tx in buffers]
+            self.formatter.tx(b''.join(buffers))
+            return super(Serial, self).writev(buffers)
+
     def read(self, size=1):
+        # data read ahead by read_until() was already shown, only log new data
+        pushback = len(self._pushback)
         rx = super(Serial, self).read(size)
-        if rx or self.show_all:
-            self.formatter.rx(rx)
+        if rx[pushback:] or self.show_all:
+            self.formatter.rx(rx[pushback:])
         return rx
 
+    if serial.Serial.readinto is not serial.SerialBase.readinto:
+        def readinto(self, b):
+            view = memoryview(b).cast('B')
+            pushback = min(len(self._pushback), len(view))
+            n = super(Serial, self).readinto(view)
+            if n > pushback or self.show_all:
+                self.formatter.rx(bytes(view[pushback:n]))
+            return n
+
+    if hasattr(serial.Serial, 'read_view'):
+        def read_view(self, size=1):
+            pushback = min(len(self._pushback), max(size, 0))
+            view = super(Serial, self).read_view(size)
+            if len(view) > pushback or self.show_all:
+                self.formatter.rx(bytes(view[pushback:]))
+            return view
+
     if hasattr(serial.Serial, 'cancel_read'):
         def cancel_read(self):
             self.formatter.control('Q-RX', 'cancel_read')
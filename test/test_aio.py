@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial - Cross platform serial port support for Python
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test serial.aio related functionality.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+try:
+    import pty
+except ImportError:
+    pty = None
+import serial
+
+if os.name == 'posix':
+    import serial.aio
+
+
+class Recorder(asyncio.Protocol):
+    def __init__(self):
+        self.received = bytearray()
+        self.paused = 0
+        self.resumed = 0
+        self.lost = None
+        self.closed = asyncio.Event()
+        self.modem_lines = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.received.extend(data)
+
+    def pause_writing(self):
+        self.paused += 1
+
+    def resume_writing(self):
+        self.resumed += 1
+
+    def connection_lost(self, exc):
+        self.lost = exc
+        self.closed.set()
+
+    def modem_lines_changed(self, cts, dsr, ri, cd):
+        self.modem_lines.append((cts, dsr, ri, cd))
+
+
+@unittest.skipIf(pty is None or os.name != 'posix', "pty module not supported on platform")
+class Test_asyncio(unittest.TestCase):
+    """Test serial.aio with a PTY"""
+
+    def setUp(self):
+        self.master, self.slave = pty.openpty()
+        self.port = os.ttyname(self.slave)
+
+    def tearDown(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+    def test_streams(self):
+        async def run():
+            reader, writer = await serial.aio.open_serial_connection(self.port, baudrate=115200)
+            os.write(self.master, b'hello\nworld\n')
+            self.assertEqual(await reader.readline(), b'hello\n')
+            self.assertEqual(await reader.readline(), b'world\n')
+            writer.write(b'ping\n')
+            await writer.drain()
+            self.assertEqual(os.read(self.master, 100), b'ping\n')
+            self.assertIsInstance(writer.get_extra_info('serial'), serial.Serial)
+            writer.close()
+            await writer.wait_closed()
+        asyncio.run(run())
+
+    def test_write_buffer_limits(self):
+        async def run():
+            loop = asyncio.get_running_loop()
+            transport, protocol = await serial.aio.create_serial_connection(loop, Recorder, self.port)
+            await asyncio.sleep(0)
+            transport.set_write_buffer_limits(high=1024)
+            self.assertEqual(transport.get_write_buffer_limits(), (256, 1024))
+            data = bytes(range(256)) * 1024
+            transport.write(data)
+            self.assertEqual(protocol.paused, 1)
+            received = bytearray()
+            while len(received) < len(data):
+                await asyncio.sleep(0.001)
+                try:
+                    received.extend(os.read(self.master, 65536))
+                except BlockingIOError:
+                    pass
+            self.assertEqual(received, data)
+            self.assertEqual(protocol.resumed, 1)
+            self.assertEqual(transport.get_write_buffer_size(), 0)
+            transport.close()
+            self.assertTrue(transport.is_closing())
+            await asyncio.wait_for(protocol.closed.wait(), 1)
+            self.assertIsNone(protocol.lost)
+        os.set_blocking(self.master, False)
+        asyncio.run(run())
+
+    def test_pause_reading_and_modem_lines(self):
+        async def run():
+            loop = asyncio.get_running_loop()
+            cts = mock.PropertyMock(return_value=False)
+            with mock.patch.object(serial.Serial, 'cts', cts), \
+                    mock.patch.object(serial.Serial, 'dsr', mock.PropertyMock(return_value=True)), \
+                    mock.patch.object(serial.Serial, 'ri', mock.PropertyMock(return_value=False)), \
+                    mock.patch.object(serial.Serial, 'cd', mock.PropertyMock(return_value=True)):
+                transport, protocol = await serial.aio.create_serial_connection(
+                    loop, Recorder, self.port, modem_poll_interval=0.01)
+                await asyncio.sleep(0.05)
+                cts.return_value = True
+                await asyncio.sleep(0.05)
+            self.assertEqual(protocol.modem_lines, [(False, True, False, True), (True, True, False, True)])
+            transport.pause_reading()
+            os.write(self.master, b'data')
+            await asyncio.sleep(0.05)
+            self.assertEqual(protocol.received, b'')
+            transport.resume_reading()
+            await asyncio.sleep(0.05)
+            self.assertEqual(protocol.received, b'data')
+            transport.abort()
+            await asyncio.sleep(0)
+            self.assertFalse(transport.is_reading())
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    sys.stdout.write(__doc__)
+    # When this module is executed from the command-line, it runs all its tests
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial - Cross platform serial port support for Python
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test that the benchmarks run and report results.
+"""
+
+import io
+import json
+import unittest
+from unittest import mock
+
+import serial.benchmarks
+import serial.benchmarks.__main__
+
+
+class Test_Benchmarks(unittest.TestCase):
+    """Run the benchmarks with small sizes"""
+
+    def test_run(self):
+        """all port benchmarks over loop:// and socket://, and the parsers"""
+        report = serial.benchmarks.run(transports=('loop', 'socket'), size=2048, count=10)
+        results = dict(((r['benchmark'], r['transport']), r) for r in report['results'])
+        self.assertEqual(len(results), 2 + 2 * len(serial.benchmarks.PORT_BENCHMARKS))
+        for (benchmark, transport), result in results.items():
+            self.assertNotIn('error', result)
+            if benchmark == 'latency':
+                self.assertEqual(result['count'], 10)
+                self.assertLessEqual(result['p50'], result['p99'])
+            else:
+                self.assertGreater(result['mb_per_s'], 0)
+        changes = serial.benchmarks.compare(report, report)
+        self.assertIn(('read', 'loop', 'mb_per_s', results['read', 'loop']['mb_per_s'],
+                       results['read', 'loop']['mb_per_s']), changes)
+
+    def test_unknown_names(self):
+        """unknown transports and benchmarks are rejected"""
+        self.assertRaises(ValueError, serial.benchmarks.run, transports=('nope',))
+        self.assertRaises(ValueError, serial.benchmarks.run, benchmarks=('nope',))
+
+    def test_main(self):
+        """the command line interface writes JSON"""
+        output = io.StringIO()
+        with mock.patch('sys.stdout', output):
+            serial.benchmarks.__main__.main(['-q', '-t', 'loop', '-b', 'read,packetizer', '-s', '1024'])
+        report = json.loads(output.getvalue())
+        self.assertEqual([r['benchmark'] for r in report['results']], ['packetizer', 'read'])
+
+
+if __name__ == '__main__':
+    import sys
+    sys.stdout.write(__doc__)
+    sys.argv[1:] = ['-v']
+    # When this module is executed from the command-line, it runs all its tests
+    unittest.main()
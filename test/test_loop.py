@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial - Cross platform serial port support for Python
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the loop:// handler.
+"""
+
+import threading
+import time
+import unittest
+import serial
+
+
+class Test_Loop(unittest.TestCase):
+    """Test the ring buffer of loop://"""
+
+    def test_bulk_transfer(self):
+        """data larger than the buffer is passed through in order"""
+        data = bytes(range(256)) * 1000
+        with serial.serial_for_url('loop://', baudrate=4000000, timeout=2) as ser:
+            writer = threading.Thread(target=ser.write, args=(data,))
+            writer.start()
+            received = ser.read(len(data))
+            writer.join()
+            self.assertEqual(received, data)
+            self.assertEqual(ser.in_waiting, 0)
+
+    def test_buffer_full(self):
+        """writes block when the buffer is full, honoring write_timeout"""
+        with serial.serial_for_url('loop://', baudrate=4000000, timeout=0, write_timeout=0) as ser:
+            self.assertEqual(ser.write(b'x' * 5000), 4096)
+            self.assertEqual(ser.in_waiting, 4096)
+            ser.write_timeout = 0.2
+            self.assertRaises(serial.SerialTimeoutException, ser.write, b'y')
+            self.assertEqual(ser.read(5000), b'x' * 4096)
+            self.assertEqual(ser.read(1), b'')
+
+    def test_cancel_read_wakes_up(self):
+        """cancel_read returns what was received so far"""
+        with serial.serial_for_url('loop://', timeout=None) as ser:
+            ser.write(b'ab')
+            threading.Timer(0.2, ser.cancel_read).start()
+            self.assertEqual(ser.read(10), b'ab')
+
+    def test_throttle(self):
+        """with throttle, data arrives at the pace of the baudrate"""
+        with serial.serial_for_url('loop://?throttle', baudrate=9600, timeout=2) as ser:
+            start = time.time()
+            self.assertEqual(ser.write(b'x' * 96), 96)
+            self.assertGreater(ser.out_waiting, 0)
+            self.assertEqual(ser.read(96), b'x' * 96)
+            self.assertAlmostEqual(time.time() - start, 0.1, delta=0.05)
+            ser.write(b'y' * 96)
+            ser.flush()
+            self.assertEqual(ser.out_waiting, 0)
+            self.assertAlmostEqual(time.time() - start, 0.2, delta=0.05)
+
+    def test_emulate_timing(self):
+        """the character time depends on the frame format"""
+        with serial.serial_for_url('loop://?emulate_timing=1', baudrate=9600, timeout=2,
+                                   parity=serial.PARITY_EVEN, stopbits=serial.STOPBITS_TWO) as ser:
+            start = time.time()
+            ser.write(b'x' * 120)
+            self.assertEqual(ser.read(120), b'x' * 120)
+            # 12 bits per character
+            self.assertAlmostEqual(time.time() - start, 0.15, delta=0.05)
+
+    def test_emulate_timing_tx_fifo(self):
+        """writes wait for space in the TX FIFO"""
+        with serial.serial_for_url('loop://?emulate_timing=1&tx_fifo=16', baudrate=9600, timeout=2) as ser:
+            start = time.time()
+            self.assertEqual(ser.write(b'x' * 100), 100)
+            self.assertLessEqual(ser.out_waiting, 16)
+            self.assertAlmostEqual(time.time() - start, 0.084, delta=0.04)
+            ser.write_timeout = 0
+            self.assertLessEqual(ser.write(b'y' * 100), 16)
+
+    def test_emulate_timing_inter_byte_timeout(self):
+        """a gap between frames ends a read with inter_byte_timeout"""
+        with serial.serial_for_url('loop://?emulate_timing=1', baudrate=9600, timeout=2,
+                                   inter_byte_timeout=0.02) as ser:
+            ser.write(b'abc')
+            threading.Timer(0.1, ser.write, (b'def',)).start()
+            self.assertEqual(ser.read(6), b'abc')
+            self.assertEqual(ser.read(6), b'def')
+
+
+if __name__ == '__main__':
+    import sys
+    sys.stdout.write(__doc__)
+    sys.argv[1:] = ['-v']
+    # When this module is executed from the command-line, it runs all its tests
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial - Cross platform serial port support for Python
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the pair:// handler.
+"""
+
+import threading
+import time
+import unittest
+import serial
+from serial.urlhandler import protocol_pair
+
+
+class Test_Pair(unittest.TestCase):
+    """Test two cross-connected virtual ports"""
+
+    def test_data(self):
+        """data written to one end is received by the other"""
+        data = bytes(range(256)) * 100
+        with serial.serial_for_url('pair://data/a', timeout=2) as a, \
+                serial.serial_for_url('pair://data/b', timeout=2) as b:
+            a.write(b'hello')
+            b.write(b'world')
+            self.assertEqual(b.read(5), b'hello')
+            self.assertEqual(a.read(5), b'world')
+            self.assertEqual(a.in_waiting, 0)
+            writer = threading.Thread(target=b.write, args=(data,))
+            writer.start()
+            self.assertEqual(a.read(len(data)), data)
+            writer.join()
+
+    def test_modem_lines(self):
+        """RTS->CTS, DTR->DSR/CD, inactive while the other end is closed"""
+        with serial.serial_for_url('pair://lines/a') as a:
+            self.assertFalse(a.cts)
+            self.assertFalse(a.dsr)
+            with serial.serial_for_url('pair://lines/b') as b:
+                self.assertTrue(a.cts)
+                self.assertTrue(a.dsr)
+                self.assertTrue(a.cd)
+                b.rts = False
+                self.assertFalse(a.cts)
+                self.assertTrue(a.dsr)
+                b.dtr = False
+                self.assertFalse(a.dsr)
+                self.assertFalse(a.cd)
+                a.dtr = False
+                self.assertTrue(b.cts)
+                self.assertFalse(b.dsr)
+                self.assertFalse(b.ri)
+            self.assertFalse(a.cts)
+
+    def test_open_close(self):
+        """an end can only be opened once, the pair is removed when closed"""
+        a = serial.serial_for_url('pair://reopen/a')
+        self.assertRaises(serial.SerialException, serial.serial_for_url, 'pair://reopen/a')
+        a.write(b'x')
+        a.close()
+        with serial.serial_for_url('pair://reopen/b', timeout=0) as b:
+            self.assertEqual(b.read(1), b'')
+        self.assertRaises(serial.SerialException, serial.serial_for_url, 'pair://reopen/c')
+        self.assertRaises(serial.SerialException, serial.serial_for_url, 'pair:///a')
+
+    def test_unconnected(self):
+        """writes to an end that is not open are discarded instead of blocking"""
+        data = b'x' * 10000
+        with serial.serial_for_url('pair://unconnected/a', timeout=1) as a:
+            self.assertEqual(a.write(data), len(data))
+            with serial.serial_for_url('pair://unconnected/b', timeout=0) as b:
+                self.assertEqual(b.read(1), b'')
+                # a writer that is blocked by the full buffer continues when b is closed
+                writer = threading.Thread(target=a.write, args=(data,))
+                writer.start()
+                time.sleep(0.1)
+                self.assertTrue(writer.is_alive())
+            writer.join(1)
+            self.assertFalse(writer.is_alive())
+
+    def test_buffer_size(self):
+        """both ends must use the same buffer size"""
+        with serial.serial_for_url('pair://size/a'):
+            b = serial.serial_for_url('pair://size/b', do_not_open=True)
+            b.buffer_size = 100
+            self.assertRaises(ValueError, b.open)
+            b.buffer_size = 4096
+            b.open()
+            b.close()
+
+    def test_open_failure(self):
+        """an end that failed to open is not kept registered"""
+        self.assertRaises(ValueError, serial.serial_for_url, 'pair://failure/a', baudrate=2 ** 33)
+        self.assertNotIn('failure', protocol_pair._links)
+        with serial.serial_for_url('pair://failure/a') as a:
+            self.assertRaises(ValueError, serial.serial_for_url, 'pair://failure/b', baudrate=2 ** 33)
+            self.assertFalse(a.cts)
+            with serial.serial_for_url('pair://failure/b'):
+                self.assertTrue(a.cts)
+        self.assertNotIn('failure', protocol_pair._links)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.stdout.write(__doc__)
+    sys.argv[1:] = ['-v']
+    # When this module is executed from the command-line, it runs all its tests
+    unittest.main()
@@ -8,8 +8,14 @@
 Test PTY related functionality.
 """
 
+import io
 import os
+import select
 import sys
+import termios
+import threading
+import time
+from unittest import mock
 
 try:
     import pty
@@ -40,6 +46,144 @@ class Test_Pty_Serial_Open(unittest.TestCase):
                 out = slave.read(len(DATA))
                 self.assertEqual(DATA, out)
 
+    def test_pty_serial_readinto(self):
+        for cls in (serial.Serial, serial.PosixPollSerial, serial.VTIMESerial):
+            with cls(os.ttyname(self.slave), timeout=1) as slave:
+                os.write(self.master, DATA)
+                buf = bytearray(len(DATA) + 2)
+                view = memoryview(buf)
+                self.assertEqual(slave.readinto(view[2:]), len(DATA))
+                self.assertEqual(buf[2:], DATA)
+
+    def test_pty_serial_inter_byte_timeout(self):
+        """read() and readinto() return when the data stops, not after the timeout"""
+        for cls in (serial.Serial, serial.PosixPollSerial):
+            with cls(os.ttyname(self.slave), timeout=5, inter_byte_timeout=0.1) as slave:
+                start = time.time()
+                os.write(self.master, DATA)
+                self.assertEqual(slave.read(100), DATA)
+                os.write(self.master, DATA)
+                buf = bytearray(100)
+                self.assertEqual(slave.readinto(buf), len(DATA))
+                self.assertEqual(buf[:len(DATA)], DATA)
+                self.assertLess(time.time() - start, 2)
+
+    def test_pty_serial_read_view(self):
+        with serial.Serial(os.ttyname(self.slave), timeout=1) as slave:
+            slave.reuse_receive_buffer = True
+            os.write(self.master, DATA)
+            view = slave.read_view(len(DATA))
+            self.assertIsInstance(view, memoryview)
+            self.assertEqual(view, DATA)
+            # a larger read must not invalidate a view that is still in use
+            os.write(self.master, DATA * 3)
+            self.assertEqual(slave.read(len(DATA) * 3), DATA * 3)
+            self.assertEqual(view, DATA)
+            self.assertEqual(slave.read_view(0), b'')
+            self.assertEqual(slave.read_view(-1), b'')
+
+    def test_pty_serial_read_negative(self):
+        """negative sizes read nothing, also after the buffer was used"""
+        for reuse in (False, True):
+            with serial.Serial(os.ttyname(self.slave), timeout=0.1) as slave:
+                slave.reuse_receive_buffer = reuse
+                os.write(self.master, DATA)
+                self.assertEqual(slave.read(100), DATA)
+                os.write(self.master, DATA)
+                self.assertEqual(slave.read(-1), b'')
+                self.assertEqual(slave.read(0), b'')
+                self.assertEqual(slave.read(len(DATA)), DATA)
+
+    def test_pty_spy_readinto(self):
+        """spy:// logs data received with read(), readinto() and read_view()"""
+        url = 'spy://{}?rawlog=test.spy'.format(os.ttyname(self.slave))
+        with serial.serial_for_url(url, timeout=1) as slave:
+            with self.assertLogs('test.spy') as logs:
+                os.write(self.master, b'abc')
+                self.assertEqual(slave.read(3), b'abc')
+                os.write(self.master, b'def')
+                buf = bytearray(3)
+                self.assertEqual(slave.readinto(buf), 3)
+                os.write(self.master, b'ghi')
+                self.assertEqual(slave.read_view(3), b'ghi')
+                slave.reuse_receive_buffer = True
+                os.write(self.master, b'jkl')
+                self.assertEqual(slave.read(3), b'jkl')
+            self.assertEqual([r.getMessage() for r in logs.records],
+                             ["RX b'abc'", "RX b'def'", "RX b'ghi'", "RX b'jkl'"])
+
+    def test_pty_serial_read_large(self):
+        data = bytes(range(256)) * 512
+        with serial.Serial(os.ttyname(self.slave), timeout=0.5) as slave:
+            threading.Thread(target=os.write, args=(self.master, data)).start()
+            self.assertEqual(slave.read(len(data)), data)
+
+    def test_pty_serial_buffered_reader(self):
+        with serial.Serial(os.ttyname(self.slave), timeout=1) as slave:
+            os.write(self.master, DATA + DATA)
+            reader = io.BufferedReader(slave)
+            self.assertEqual(reader.readline(), DATA)
+            self.assertEqual(reader.read(len(DATA)), DATA)
+
+    def test_pty_serial_writev(self):
+        with serial.Serial(os.ttyname(self.slave), timeout=1) as slave:
+            payload = bytearray(b'payload')
+            n = slave.writev([b'\x02', memoryview(payload)[1:], b'', b'\x03'])
+            self.assertEqual(n, 8)
+            self.assertEqual(os.read(self.master, 100), b'\x02ayload\x03')
+
+    def test_pty_serial_write_large(self):
+        data = bytes(range(256)) * 1024
+        with serial.Serial(os.ttyname(self.slave), timeout=1, write_timeout=5) as slave:
+            received = bytearray()
+            reader = threading.Thread(target=lambda: received.extend(self._drain(len(data))))
+            reader.start()
+            self.assertEqual(slave.write(data), len(data))
+            reader.join(5)
+            self.assertEqual(received, data)
+
+    def _drain(self, size):
+        data = bytearray()
+        while len(data) < size:
+            data.extend(os.read(self.master, size - len(data)))
+        return data
+
+    def test_pty_serial_timeout_change_skips_tty(self):
+        with serial.Serial(os.ttyname(self.slave), timeout=1) as slave:
+            with mock.patch('termios.tcgetattr', side_effect=termios.tcgetattr) as tcgetattr:
+                slave.timeout = 2
+                slave.write_timeout = 2
+                self.assertEqual(tcgetattr.call_count, 0)
+                slave.xonxoff = True
+                self.assertEqual(tcgetattr.call_count, 1)
+                self.assertTrue(termios.tcgetattr(self.slave)[0] & termios.IXON)
+
+    def test_pty_serial_stats(self):
+        with serial.Serial(os.ttyname(self.slave), timeout=0.1) as slave:
+            self.assertIsNone(slave.stats())
+            slave.enable_stats()
+            os.write(self.master, DATA)
+            self.assertEqual(slave.read(len(DATA) + 1), DATA)
+            slave.write(DATA)
+            slave.writev([DATA, DATA])
+            slave.flush()
+            stats = slave.stats()
+            self.assertEqual(stats['reads'], 1)
+            self.assertEqual(stats['bytes_read'], len(DATA))
+            self.assertEqual(stats['short_reads'], 1)
+            self.assertEqual(stats['writes'], 2)
+            self.assertEqual(stats['bytes_written'], 3 * len(DATA))
+            self.assertEqual(stats['partial_writes'], 0)
+            self.assertEqual(stats['flushes'], 1)
+            self.assertEqual(stats['latency']['read']['count'], 1)
+            self.assertGreaterEqual(stats['latency']['read']['p99'], 0.09)
+            slave.reset_stats()
+            self.assertEqual(slave.stats()['reads'], 0)
+            self.assertEqual(slave.stats()['latency']['read'], {'count': 0})
+            slave.enable_stats(False)
+            slave.write(DATA)
+            self.assertIsNone(slave.stats())
+
     def test_pty_serial_read(self):
         with serial.Serial(os.ttyname(self.slave), timeout=1) as slave:
             with os.fdopen(self.master, "rb") as fd:
@@ -48,6 +192,44 @@ class Test_Pty_Serial_Open(unittest.TestCase):
                 out = fd.read(len(DATA))
                 self.assertEqual(DATA, out)
 
+
+@unittest.skipIf(pty is None or not hasattr(select, 'epoll'), "pty or epoll not supported on platform")
+class Test_Pty_Epoll_Serial(unittest.TestCase):
+    """Test PosixEpollSerial on a PTY"""
+
+    def setUp(self):
+        self.master, self.slave = pty.openpty()
+        self.s = serial.PosixEpollSerial(os.ttyname(self.slave), timeout=1)
+
+    def tearDown(self):
+        self.s.close()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def test_read_write(self):
+        os.write(self.master, DATA)
+        self.assertEqual(self.s.read(len(DATA)), DATA)
+        self.s.write(DATA)
+        self.assertEqual(os.read(self.master, len(DATA)), DATA)
+
+    def test_read_timeout(self):
+        self.s.timeout = 0.1
+        self.assertEqual(self.s.read(1), b'')
+
+    def test_cancel_read(self):
+        self.s.timeout = 10
+        threading.Timer(0.1, self.s.cancel_read).start()
+        t1 = time.time()
+        self.assertEqual(self.s.read(1), b'')
+        self.assertLess(time.time() - t1, 5)
+
+    def test_reopen(self):
+        self.s.close()
+        self.s.open()
+        os.write(self.master, DATA)
+        self.assertEqual(self.s.read(len(DATA)), DATA)
+
+
 if __name__ == '__main__':
     sys.stdout.write(__doc__)
     # When this module is executed from the command-line, it runs all its tests
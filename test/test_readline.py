@@ -84,6 +84,38 @@ class Test_Readline(unittest.TestCase):
                 [serial.to_bytes([0x31, 0x0a]), serial.to_bytes([0x32, 0x0a]), serial.to_bytes([0x33, 0x0a])]
                 )
 
+    def test_read_until_keeps_surplus(self):
+        """Test that data following the terminator is returned by read()"""
+        self.s.write(b'abc\r\ndef\r\nghi')
+        self.assertEqual(self.s.read_until(b'\r\n'), b'abc\r\n')
+        self.assertEqual(self.s.in_waiting, 8)
+        self.assertEqual(self.s.read(2), b'de')
+        self.assertEqual(self.s.read_until(b'\r\n'), b'f\r\n')
+        self.assertEqual(self.s.read(3), b'ghi')
+        self.s.write(b'jk')
+        self.s.reset_input_buffer()
+        self.assertEqual(self.s.in_waiting, 0)
+
+    def test_read_until_split_terminator(self):
+        """Test a terminator that is received in two chunks"""
+        self.s.write(b'abc\r')
+        self.assertEqual(self.s.read(1), b'a')
+        self.s.timeout = 0.1
+        self.assertEqual(self.s.read_until(b'\r\n'), b'bc\r')
+        self.s.write(b'\r')
+        self.assertEqual(self.s.read(1), b'\r')
+        self.s.write(b'xy\r')
+        self.s.write(b'\nz')
+        self.assertEqual(self.s.read_until(b'\r\n'), b'xy\r\n')
+        self.assertEqual(self.s.read(), b'z')
+
+    def test_read_until_size(self):
+        """Test read_until with a size limit"""
+        self.s.write(b'0123456789\n')
+        self.assertEqual(self.s.read_until(size=4), b'0123')
+        self.assertEqual(self.s.readline(3), b'456')
+        self.assertEqual(self.s.readline(), b'789\n')
+
     def test_alternate_eol(self):
         """Test readline with alternative eol settings (skipped for io based systems)"""
         if hasattr(self.s, 'xreadlines'):  # test if it is our FileLike base class
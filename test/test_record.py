@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial - Cross platform serial port support for Python
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the record:// and replay:// handlers.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import serial
+from serial.urlhandler import protocol_record
+
+try:
+    import pty
+except ImportError:
+    pty = None
+
+
+class Test_Replay(unittest.TestCase):
+    """Test playing back capture files"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.capture = os.path.join(self.directory, 'test.cap')
+        with open(self.capture, 'wb') as f:
+            f.write(protocol_record.MAGIC)
+            for timestamp, event, data in ((0.0, protocol_record.CTS, b'\x00'),
+                                           (0.0, protocol_record.TX, b'?'),
+                                           (0.1, protocol_record.RX, b'hello\n'),
+                                           (0.2, protocol_record.CTS, b'\x01'),
+                                           (0.3, protocol_record.RX, b'world\n')):
+                f.write(protocol_record.RECORD.pack(timestamp, event, len(data)))
+                f.write(data)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_replay_max(self):
+        """all data is available immediately"""
+        with serial.serial_for_url('replay://{}?speed=max'.format(self.capture), timeout=1) as ser:
+            self.assertEqual(ser.write(b'?'), 1)
+            self.assertEqual(ser.in_waiting, 12)
+            self.assertEqual(ser.readline(), b'hello\n')
+            self.assertEqual(ser.read(100), b'world\n')
+            self.assertTrue(ser.cts)
+
+    def test_replay_timing(self):
+        """data and modem lines follow the timestamps"""
+        with serial.serial_for_url('replay://{}?speed=2'.format(self.capture), timeout=1) as ser:
+            self.assertEqual(ser.in_waiting, 0)
+            self.assertFalse(ser.cts)
+            start = time.time()
+            self.assertEqual(ser.readline(), b'hello\n')
+            self.assertAlmostEqual(time.time() - start, 0.05, delta=0.04)
+            self.assertEqual(ser.readline(), b'world\n')
+            self.assertAlmostEqual(time.time() - start, 0.15, delta=0.04)
+            self.assertTrue(ser.cts)
+            # end of capture
+            self.assertEqual(ser.read(1), b'')
+            self.assertLess(time.time() - start, 0.5)
+
+    def test_invalid(self):
+        """missing or invalid capture files and options raise SerialException"""
+        self.assertRaises(serial.SerialException, serial.serial_for_url, 'replay://{}/missing'.format(self.directory))
+        self.assertRaises(serial.SerialException, serial.serial_for_url, 'replay://{}?speed=0'.format(self.capture))
+        self.assertRaises(serial.SerialException, serial.serial_for_url, 'record:///dev/null')
+        with open(self.capture, 'wb') as f:
+            f.write(b'something else')
+        self.assertRaises(serial.SerialException, serial.serial_for_url, 'replay://{}'.format(self.capture))
+
+
+@unittest.skipIf(pty is None, "pty module not supported on platform")
+class Test_Record(unittest.TestCase):
+    """Test recording the traffic of a port"""
+
+    def setUp(self):
+        self.master, self.slave = pty.openpty()
+        self.directory = tempfile.mkdtemp()
+        self.capture = os.path.join(self.directory, 'test.cap')
+
+    def tearDown(self):
+        os.close(self.master)
+        os.close(self.slave)
+        shutil.rmtree(self.directory)
+
+    def test_record_replay(self):
+        """recorded RX data is played back"""
+        url = 'record://{}?file={}'.format(os.ttyname(self.slave), self.capture)
+        with serial.serial_for_url(url, timeout=1) as ser:
+            ser.write(b'ping')
+            self.assertEqual(os.read(self.master, 4), b'ping')
+            os.write(self.master, b'line 1\nline 2\n')
+            self.assertEqual(ser.readline(), b'line 1\n')
+            self.assertEqual(ser.readline(), b'line 2\n')
+            os.write(self.master, b'abcdef')
+            buf = bytearray(3)
+            self.assertEqual(ser.readinto(buf), 3)
+            self.assertEqual(ser.read_view(3), b'def')
+            ser.send_break(0.01)
+        with open(self.capture, 'rb') as f:
+            records = [(event, data) for _, event, data in protocol_record.iter_records(f)]
+        # the initial levels of the output lines come first
+        self.assertEqual(records[:4], [
+            (protocol_record.RTS, b'\x01'),
+            (protocol_record.DTR, b'\x01'),
+            (protocol_record.BREAK, b'\x00'),
+            (protocol_record.TX, b'ping')])
+        self.assertEqual(b''.join(data for event, data in records if event == protocol_record.RX),
+                         b'line 1\nline 2\nabcdef')
+        self.assertEqual(records[-2:], [(protocol_record.BREAK, b'\x01'), (protocol_record.BREAK, b'\x00')])
+        with serial.serial_for_url('replay://{}?speed=max'.format(self.capture), timeout=1) as ser:
+            self.assertEqual(ser.read(100), b'line 1\nline 2\nabcdef')
+
+
+if __name__ == '__main__':
+    import sys
+    sys.stdout.write(__doc__)
+    sys.argv[1:] = ['-v']
+    # When this module is executed from the command-line, it runs all its tests
+    unittest.main()
@@ -8,11 +8,83 @@
 Test RFC 2217 related functionality.
 """
 
+import socket
+import threading
+import time
 import unittest
+from unittest import mock
 import serial
 import serial.rfc2217
 
 
+class LoopServer(object):
+    """\
+    RFC 2217 server for one connection on localhost that is backed by a
+    loop:// port, similar to examples/rfc2217_server.py
+    """
+
+    def __init__(self):
+        self.server = socket.socket()
+        self.server.bind(('localhost', 0))
+        self.server.listen(1)
+        self.url = 'rfc2217://localhost:{}'.format(self.server.getsockname()[1])
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def serve(self):
+        try:
+            connection, _ = self.server.accept()
+        except OSError:
+            return  # closed without connection
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        ser = serial.serial_for_url('loop://', timeout=0.05)
+        write_lock = threading.Lock()
+        alive = [True]
+
+        class Connection(object):
+            def write(self, data):
+                with write_lock:
+                    connection.sendall(data)
+
+        manager = serial.rfc2217.PortManager(ser, Connection())
+
+        def reader():
+            while alive[0]:
+                data = ser.read(ser.in_waiting or 1)
+                if data:
+                    try:
+                        Connection().write(manager.escape_bytes(data))
+                    except OSError:
+                        break
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        try:
+            while True:
+                data = connection.recv(65536)
+                if not data:
+                    break
+                ser.write(manager.filter_bytes(data))
+        except OSError:
+            pass
+        finally:
+            alive[0] = False
+            thread.join()
+            ser.close()
+            connection.close()
+
+    def close(self):
+        self.server.close()
+        self.thread.join(5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+
 class Test_RFC2217(unittest.TestCase):
     """Test RFC 2217 related functionality"""
 
@@ -32,6 +104,125 @@ class Test_RFC2217(unittest.TestCase):
         self.assertFalse(s.is_open)
         s.close()  # no errors expected
 
+    def test_data_transfer(self):
+        """data with IAC bytes passes in bulk, in_waiting counts bytes"""
+        data = bytes(range(256)) * 256
+        with LoopServer() as server:
+            with serial.serial_for_url(server.url, timeout=2) as s:
+                s.write(b'\xff\xffab\xff')
+                timeout = serial.Timeout(2)
+                while s.in_waiting < 5 and not timeout.expired():
+                    time.sleep(0.01)
+                self.assertEqual(s.in_waiting, 5)
+                self.assertEqual(s.read(2), b'\xff\xff')
+                self.assertEqual(s.in_waiting, 3)
+                self.assertEqual(s.read(3), b'ab\xff')
+                writer = threading.Thread(target=s.write, args=(data,))
+                writer.start()
+                self.assertEqual(s.read(len(data)), data)
+                writer.join()
+                self.assertEqual(s.in_waiting, 0)
+                s.write(b'line 1\nline\xff 2\nrest')
+                self.assertEqual(s.readline(), b'line 1\n')
+                self.assertEqual(s.readline(), b'line\xff 2\n')
+                self.assertEqual(s.read_until(b'\n', 2), b're')
+                self.assertEqual(s.read(2), b'st')
+
+    def test_reconfigure_latency(self):
+        """option negotiation completes when the answer arrives, without polling"""
+        with LoopServer() as server:
+            start = time.time()
+            with serial.serial_for_url(server.url, timeout=1) as s:
+                for baudrate in (1200, 2400, 4800, 9600, 19200) * 4:
+                    s.baudrate = baudrate
+                s.dtr = False
+                s.reset_input_buffer()
+                self.assertEqual(s.baudrate, 19200)
+                # with the former 50 ms polling steps this took more than a second
+                self.assertLess(time.time() - start, 0.5)
+
+    def test_reconfigure_pipelined(self):
+        """changed settings are sent in one write, unchanged ones are skipped"""
+        with LoopServer() as server:
+            with serial.serial_for_url(server.url, timeout=1) as s:
+                writes = []
+                raw_write = s._internal_raw_write
+
+                def counting_write(data):
+                    writes.append(data)
+                    raw_write(data)
+
+                s._internal_raw_write = counting_write
+                s._reconfigure_port()
+                self.assertEqual(writes, [])
+                s.baudrate = 19200
+                self.assertEqual(len(writes), 1)
+                self.assertEqual(writes[0].count(serial.rfc2217.SB), 1)
+                del writes[:]
+                s.apply_settings({'baudrate': 38400, 'parity': serial.PARITY_EVEN, 'rtscts': True})
+                self.assertEqual(len(writes), 1)
+                self.assertEqual(writes[0].count(serial.rfc2217.SB), 3)
+                self.assertEqual(s._rfc2217_port_settings['parity'].state, serial.rfc2217.ACTIVE)
+
+    def test_reconfigure_rejected(self):
+        """a rejected flow control raises at once, not after the timeout"""
+        send_subnegotiation = serial.rfc2217.PortManager.rfc2217_send_subnegotiation
+
+        def rejecting_server(manager, option, value=b''):
+            if option == serial.rfc2217.SERVER_SET_BAUDRATE:
+                return  # no answer at all
+            if option == serial.rfc2217.SERVER_SET_CONTROL and value == serial.rfc2217.SET_CONTROL_USE_HW_FLOW_CONTROL:
+                value = serial.rfc2217.SET_CONTROL_USE_NO_FLOW_CONTROL
+            send_subnegotiation(manager, option, value)
+
+        with LoopServer() as server:
+            with serial.serial_for_url(server.url, timeout=1) as s:
+                with mock.patch.object(serial.rfc2217.PortManager, 'rfc2217_send_subnegotiation', rejecting_server):
+                    start = time.time()
+                    with self.assertRaisesRegex(ValueError, 'control'):
+                        s.apply_settings({'baudrate': 4800, 'rtscts': True})
+                    self.assertLess(time.time() - start, 1)
+
+    def test_receive_buffer(self):
+        """read() and read_until() of the receive buffer"""
+        buf = serial.rfc2217.ReceiveBuffer()
+        threading.Timer(0.1, buf.put, (b'a\r',)).start()
+        threading.Timer(0.2, buf.put, (b'\nbcd',)).start()
+        self.assertEqual(buf.read_until(b'\r\n', None, serial.Timeout(1)), b'a\r\n')
+        self.assertEqual(len(buf), 3)
+        self.assertEqual(buf.read_until(b'\n', 2, serial.Timeout(1)), b'bc')
+        self.assertEqual(buf.read_until(b'\n', None, serial.Timeout(0.1)), b'd')
+        buf.put(b'xyz')
+        self.assertEqual(buf.read(2, serial.Timeout(0)), b'xy')
+        threading.Timer(0.1, buf.close).start()
+        self.assertEqual(buf.read(5, serial.Timeout(None)), b'z')
+        self.assertEqual(len(buf), 0)
+
+    def test_port_manager_filter(self):
+        """escape_bytes() and filter_bytes() match the generators"""
+        ser = serial.serial_for_url('loop://')
+        sent = []
+
+        class Connection(object):
+            def write(self, data):
+                sent.append(data)
+
+        manager = serial.rfc2217.PortManager(ser, Connection())
+        del sent[:]
+        data = bytes(range(256)) * 4
+        self.assertEqual(manager.escape_bytes(data), b''.join(manager.escape(data)))
+        self.assertEqual(manager.escape_bytes(b'a\xffb'), b'a\xff\xffb')
+        # data, doubled IAC, a NOP command and a purge request split at odd places
+        stream = b'ab\xff\xffc\xff\xf1d' + serial.rfc2217.IAC + serial.rfc2217.SB + \
+            serial.rfc2217.COM_PORT_OPTION + serial.rfc2217.PURGE_DATA + \
+            serial.rfc2217.PURGE_RECEIVE_BUFFER + serial.rfc2217.IAC + serial.rfc2217.SE + b'e'
+        self.assertEqual(b''.join(manager.filter_bytes(stream[n:n + 3]) for n in range(0, len(stream), 3)),
+                         b'ab\xffcde')
+        purge = serial.rfc2217.SERVER_PURGE_DATA + serial.rfc2217.PURGE_RECEIVE_BUFFER
+        self.assertTrue(sent[-1].endswith(purge + serial.rfc2217.IAC + serial.rfc2217.SE))
+        self.assertEqual(b''.join(manager.filter(b'x\xff\xffy')), b'x\xffy')
+        ser.close()
+
 
 if __name__ == '__main__':
     import sys
@@ -68,6 +68,42 @@ class Test_SettingsDict(unittest.TestCase):
             self.assertEqual(getattr(ser, setting), value)
             self.assertEqual(d[setting], value)
 
+    def test_apply_settings_reconfigures_once(self):
+        """apply_settings reconfigures an open port only once"""
+        ser = serial.serial_for_url(PORT)
+        calls = []
+        reconfigure_port = ser._reconfigure_port
+        ser._reconfigure_port = lambda: calls.append(reconfigure_port())
+        ser.apply_settings({'baudrate': 57600, 'bytesize': serial.SEVENBITS,
+                            'parity': serial.PARITY_EVEN, 'timeout': 3})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(ser.baudrate, 57600)
+        ser.close()
+
+    def test_settings_transaction(self):
+        """changes in a (nested) transaction are applied when it is left"""
+        ser = serial.serial_for_url(PORT)
+        calls = []
+        reconfigure_port = ser._reconfigure_port
+        ser._reconfigure_port = lambda: calls.append(reconfigure_port())
+        with ser.settings_transaction():
+            ser.baudrate = 19200
+            with ser.settings_transaction():
+                ser.stopbits = serial.STOPBITS_TWO
+            self.assertEqual(calls, [])
+            ser.timeout = 2
+        self.assertEqual(len(calls), 1)
+        with ser.settings_transaction():
+            pass
+        self.assertEqual(len(calls), 1)
+        # the port is also reconfigured when the block is left with an error
+        with self.assertRaises(ValueError):
+            with ser.settings_transaction():
+                ser.baudrate = 9600
+                ser.parity = 'X'
+        self.assertEqual(len(calls), 2)
+        ser.close()
+
 
 if __name__ == '__main__':
     import sys
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial - Cross platform serial port support for Python
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test the I/O statistics of ports.
+"""
+
+import socket
+import unittest
+import serial
+from serial.serialutil import LatencyHistogram
+
+
+class Test_LatencyHistogram(unittest.TestCase):
+    """Test the latency histogram"""
+
+    def test_percentiles(self):
+        """percentiles are within the bucket precision"""
+        histogram = LatencyHistogram()
+        for value in range(1, 100001):
+            histogram.record(value)
+        self.assertEqual(histogram.count, 100000)
+        self.assertEqual(histogram.min, 1)
+        self.assertEqual(histogram.max, 100000)
+        for percent in (50, 90, 99):
+            expected = 1000 * percent
+            self.assertLessEqual(abs(histogram.percentile(percent) - expected), expected * 0.07)
+        self.assertEqual(histogram.percentile(100), 100000)
+
+    def test_small_values(self):
+        """values below 32 are exact"""
+        histogram = LatencyHistogram()
+        for value in (0, 5, 31):
+            histogram.record(value)
+        self.assertEqual(histogram.percentile(1), 0)
+        self.assertEqual(histogram.percentile(50), 5)
+        self.assertEqual(histogram.percentile(100), 31)
+        histogram.reset()
+        self.assertIsNone(histogram.percentile(50))
+        self.assertEqual(histogram.summary(), {'count': 0})
+
+
+class Test_SocketStats(unittest.TestCase):
+    """Test the statistics of socket://"""
+
+    def setUp(self):
+        self.server = socket.socket()
+        self.server.bind(('localhost', 0))
+        self.server.listen(1)
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_stats(self):
+        """reads, writes and short reads are counted"""
+        ser = serial.serial_for_url('socket://localhost:{}'.format(self.server.getsockname()[1]), timeout=0.1)
+        ser.enable_stats()
+        connection, _ = self.server.accept()
+        try:
+            ser.write(b'hello')
+            self.assertEqual(connection.recv(10), b'hello')
+            connection.sendall(b'world')
+            self.assertEqual(ser.read(10), b'world')
+            stats = ser.stats()
+            self.assertEqual(stats['writes'], 1)
+            self.assertEqual(stats['bytes_written'], 5)
+            self.assertEqual(stats['reads'], 1)
+            self.assertEqual(stats['bytes_read'], 5)
+            self.assertEqual(stats['short_reads'], 1)
+            self.assertEqual(stats['latency']['write']['count'], 1)
+            # enabling again keeps the counters, disabling drops them
+            ser.enable_stats()
+            self.assertEqual(ser.stats()['writes'], 1)
+            ser.enable_stats(False)
+            ser.enable_stats()
+            self.assertEqual(ser.stats()['writes'], 0)
+        finally:
+            connection.close()
+            ser.close()
+
+
+if __name__ == '__main__':
+    import sys
+    sys.stdout.write(__doc__)
+    sys.argv[1:] = ['-v']
+    # When this module is executed from the command-line, it runs all its tests
+    unittest.main()
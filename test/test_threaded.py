@@ -8,12 +8,19 @@
 Test serial.threaded related functionality.
 """
 
+import concurrent.futures
 import os
+import threading
 import unittest
 import serial
 import serial.threaded
 import time
 
+try:
+    import pty
+except ImportError:
+    pty = None
+
 
 # on which port should the tests be performed:
 PORT = 'loop://'
@@ -63,6 +70,266 @@ class Test_threaded(unittest.TestCase):
             time.sleep(1)
             self.assertEqual(protocol.received_packets, [b'1', b'2', b'3'])
 
+    def test_framed_packet_chunks(self):
+        """packets and data between them are found across chunks"""
+
+        class TestFramedPacket(serial.threaded.FramedPacket):
+            def __init__(self):
+                super(TestFramedPacket, self).__init__()
+                self.received = []
+
+            def handle_packet(self, packet):
+                self.received.append(('packet', packet))
+
+            def handle_out_of_packet_data(self, data):
+                self.received.append(('data', data))
+
+        protocol = TestFramedPacket()
+        for chunk in (b'xy(ab', b'c)(d(e', b')', b'z)', b'(', b'f)'):
+            protocol.data_received(chunk)
+        self.assertEqual(protocol.received, [
+            ('data', b'xy'),
+            ('packet', b'abc'),
+            ('packet', b'de'),
+            ('data', b'z'),
+            ('packet', b''),
+            ('packet', b'f')])
+
+    def test_packetizer_chunks(self):
+        """packets split across chunks, views and the buffer limit"""
+
+        class TestPacketizer(serial.threaded.Packetizer):
+            TERMINATOR = b'\r\n'
+            MAX_BUFFER_SIZE = 8
+
+            def __init__(self):
+                super(TestPacketizer, self).__init__()
+                self.received = []
+
+            def handle_packet(self, packet):
+                self.received.append(('packet', bytes(packet)))
+
+            def handle_overflow(self, data):
+                self.received.append(('overflow', data))
+
+        for views in (False, True):
+            protocol = TestPacketizer()
+            protocol.PACKET_VIEWS = views
+            for chunk in (b'ab\r', b'\ncd\r\n\r\nef', b'\r', b'\n', b'0123456789', b'g\r\n'):
+                protocol.data_received(chunk)
+            self.assertEqual(protocol.received, [
+                ('packet', b'ab'),
+                ('packet', b'cd'),
+                ('packet', b''),
+                ('packet', b'ef'),
+                ('overflow', b'0123456789'),
+                ('packet', b'g')])
+            self.assertEqual(protocol.buffer, b'')
+
+    def test_packetizer_error(self):
+        """packets are not delivered again after handle_packet failed"""
+
+        class TestPacketizer(serial.threaded.Packetizer):
+            def __init__(self):
+                super(TestPacketizer, self).__init__()
+                self.received = []
+
+            def handle_packet(self, packet):
+                self.received.append(bytes(packet))
+                if packet == b'2':
+                    raise ValueError('bad packet')
+
+        for views in (False, True):
+            protocol = TestPacketizer()
+            protocol.PACKET_VIEWS = views
+            self.assertRaises(ValueError, protocol.data_received, b'1\x002\x003\x004')
+            self.assertEqual(protocol.buffer, b'3\x004')
+            protocol.data_received(b'\x00')
+            self.assertEqual(protocol.received, [b'1', b'2', b'3', b'4'])
+            self.assertEqual(protocol.buffer, b'')
+
+    def test_packetizer_views_kept(self):
+        """packet views that are kept by handle_packet stay valid"""
+
+        class TestPacketizer(serial.threaded.Packetizer):
+            PACKET_VIEWS = True
+
+            def __init__(self):
+                super(TestPacketizer, self).__init__()
+                self.received = []
+
+            def handle_packet(self, packet):
+                self.received.append(packet)
+
+        protocol = TestPacketizer()
+        protocol.data_received(b'1\x002\x003')
+        protocol.data_received(b'\x00')
+        self.assertEqual([bytes(p) for p in protocol.received], [b'1', b'2', b'3'])
+
+    def test_binary_framing(self):
+        """length prefix, SLIP and COBS framing with and without CRC"""
+        all_payloads = [b'', b'\x00', b'\xc0\xdb\xdc\xdd', bytes(range(256)) * 2, b'\x11\x22\x00\x33']
+        for cls in (serial.threaded.LengthPrefixedPacketizer,
+                    serial.threaded.SlipPacketizer,
+                    serial.threaded.CobsPacketizer):
+            for crc in (None, 'crc16', 'crc32'):
+                payloads = all_payloads
+
+                class TestFraming(cls):
+                    CRC = crc
+
+                    def __init__(self):
+                        super(TestFraming, self).__init__()
+                        self.received = []
+
+                    def handle_packet(self, packet):
+                        self.received.append(packet)
+
+                    def handle_invalid_packet(self, data):
+                        self.received.append(None)
+
+                protocol = TestFraming()
+                if cls is serial.threaded.SlipPacketizer and crc is None:
+                    # empty SLIP frames are ignored
+                    payloads = payloads[1:]
+                stream = b''.join(protocol.encode(protocol._add_crc(p)) for p in payloads)
+                for n in range(0, len(stream), 7):
+                    protocol.data_received(stream[n:n + 7])
+                self.assertEqual(protocol.received, payloads, (cls, crc))
+                self.assertEqual(protocol.buffer, b'')
+                if crc is not None:
+                    # a corrupted byte is detected
+                    frame = bytearray(protocol.encode(protocol._add_crc(b'abc')))
+                    frame[-3] ^= 0x01
+                    protocol.data_received(frame)
+                    self.assertIsNone(protocol.received[-1], (cls, crc))
+
+    def test_cobs_slip_encoding(self):
+        """encoded frames match the specifications"""
+        cobs = serial.threaded.CobsPacketizer()
+        self.assertEqual(cobs.encode(b'\x00'), b'\x01\x01\x00')
+        self.assertEqual(cobs.encode(b'\x11\x22\x00\x33'), b'\x03\x11\x22\x02\x33\x00')
+        self.assertEqual(cobs.decode(b'\xff' + bytes(range(1, 255))), bytes(range(1, 255)))
+        self.assertRaises(ValueError, cobs.decode, b'\x05\x11')
+        slip = serial.threaded.SlipPacketizer()
+        self.assertEqual(slip.encode(b'a\xc0\xdb'), b'\xc0a\xdb\xdc\xdb\xdd\xc0')
+        self.assertRaises(ValueError, slip.decode, b'\xdb\x01')
+
+    def test_dispatch_queue(self):
+        """slow handlers run from a queue, in order, also with an executor"""
+
+        class SlowLines(serial.threaded.LineReader):
+            def __init__(self):
+                super(SlowLines, self).__init__()
+                self.received_lines = []
+
+            def handle_line(self, data):
+                time.sleep(0.01)
+                self.received_lines.append(data)
+
+        lines = ['line {}'.format(n) for n in range(20)]
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            for kwargs in ({}, {'executor': executor}):
+                ser = serial.serial_for_url(PORT, baudrate=115200, timeout=1)
+                with serial.threaded.ReaderThread(ser, SlowLines, queue_size=64, **kwargs) as protocol:
+                    for line in lines:
+                        protocol.write_line(line)
+                    time.sleep(1)
+                    self.assertEqual(protocol.received_lines, lines)
+                    self.assertEqual(protocol.transport.dropped_bytes, 0)
+                    self.assertEqual(protocol.transport.queue_depth, 0)
+
+    def test_dispatch_queue_overflow(self):
+        """data is dropped according to the overflow policy"""
+
+        class Blocked(serial.threaded.Protocol):
+            def __init__(self):
+                self.go = threading.Event()
+                self.received = []
+
+            def connection_made(self, transport):
+                self.transport = transport
+
+            def data_received(self, data):
+                self.go.wait(5)
+                self.received.append(data)
+
+        for overflow, expected in (('drop-newest', [b'1', b'2', b'3']),
+                                   ('drop-oldest', [b'1', b'3', b'4'])):
+            ser = serial.serial_for_url(PORT, baudrate=115200, timeout=1)
+            with serial.threaded.ReaderThread(ser, Blocked, queue_size=2, overflow=overflow) as protocol:
+                for chunk in (b'1', b'2', b'3', b'4'):
+                    protocol.transport.write(chunk)
+                    time.sleep(0.2)
+                self.assertEqual(protocol.transport.dropped_bytes, 1)
+                self.assertEqual(protocol.transport.max_queue_depth, 2)
+                protocol.go.set()
+                time.sleep(0.2)
+                self.assertEqual(protocol.received, expected)
+
+
+@unittest.skipIf(pty is None, "pty module not supported on platform")
+class Test_ReaderHub(unittest.TestCase):
+    """Test serving several ports from one ReaderHub"""
+
+    def setUp(self):
+        self.ptys = [pty.openpty() for _ in range(4)]
+
+    def tearDown(self):
+        for master, slave in self.ptys:
+            os.close(master)
+            os.close(slave)
+
+    def test_line_reader(self):
+        """every port gets its own protocol instance"""
+
+        class TestLines(serial.threaded.LineReader):
+            def __init__(self):
+                super(TestLines, self).__init__()
+                self.received_lines = []
+
+            def handle_line(self, data):
+                self.received_lines.append(data)
+                self.write_line(data.upper())
+
+        with serial.threaded.ReaderHub() as hub:
+            connections = [hub.add(serial.Serial(os.ttyname(slave)), TestLines) for _, slave in self.ptys]
+            protocols = [connection.connect()[1] for connection in connections]
+            self.assertEqual(len(hub.connections), 4)
+            for i, (master, _) in enumerate(self.ptys):
+                os.write(master, 'hello {}\r\n'.format(i).encode())
+            for i, (master, _) in enumerate(self.ptys):
+                self.assertEqual(os.read(master, 100), 'HELLO {}\r\n'.format(i).encode())
+            for i, protocol in enumerate(protocols):
+                self.assertEqual(protocol.received_lines, ['hello {}'.format(i)])
+            connections[0].close()
+            self.assertFalse(connections[0].serial.is_open)
+            self.assertEqual(len(hub.connections), 3)
+        for connection in connections:
+            self.assertFalse(connection.alive)
+            self.assertFalse(connection.serial.is_open)
+
+    def test_protocol_error(self):
+        """an exception in one protocol only removes that port"""
+        lost = []
+
+        class Failing(serial.threaded.Protocol):
+            def data_received(self, data):
+                raise ValueError(data)
+
+            def connection_lost(self, exc):
+                lost.append(exc)
+
+        with serial.threaded.ReaderHub() as hub:
+            connections = [hub.add(serial.Serial(os.ttyname(slave)), Failing) for _, slave in self.ptys[:2]]
+            for connection in connections:
+                connection.connect()
+            os.write(self.ptys[0][0], b'x')
+            connections[0]._removed.wait(2)
+            self.assertFalse(connections[0].alive)
+            self.assertTrue(connections[1].alive)
+            self.assertIsInstance(lost[0], ValueError)
+
 
 if __name__ == '__main__':
     import sys
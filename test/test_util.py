@@ -27,6 +27,21 @@ class Test_util(unittest.TestCase):
     def test_iterbytes(self):
         self.assertEqual(list(serial.iterbytes(b'\x01\x02\x03')), [b'\x01', b'\x02', b'\x03'])
 
+    def test_read_until_without_read_ahead(self):
+        """backends that do not serve the pushback are read byte by byte"""
+        class DummySerial(serial.SerialBase):
+            data = bytearray(b'abc\ndef')
+            in_waiting = len(data)
+
+            def read(self, size=1):
+                chunk = bytes(self.data[:size])
+                del self.data[:size]
+                return chunk
+
+        s = DummySerial()
+        self.assertEqual(s.read_until(), b'abc\n')
+        self.assertEqual(s.read(3), b'def')
+
 
 if __name__ == '__main__':
     import sys
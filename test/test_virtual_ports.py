@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+#
+# This file is part of pySerial - Cross platform serial port support for Python
+# (C) 2026
+#
+# SPDX-License-Identifier:    BSD-3-Clause
+"""\
+Test serial.tools.virtual_ports.
+"""
+
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+import serial
+
+try:
+    from serial.tools import virtual_ports
+except ImportError:
+    virtual_ports = None
+
+
+@unittest.skipIf(virtual_ports is None, "pty module not supported on platform")
+class Test_VirtualPorts(unittest.TestCase):
+    """Test virtual ports and the pump"""
+
+    def setUp(self):
+        self.ports = virtual_ports.create(2)
+
+    def tearDown(self):
+        for port in self.ports:
+            port.close()
+
+    def test_null_modem(self):
+        """two connected virtual ports pass data unchanged in bulk"""
+        data = bytes(range(256)) * 256
+        with virtual_ports.Pump() as pump:
+            pump.connect(*self.ports)
+            with serial.Serial(self.ports[0].name, timeout=2) as a, \
+                    serial.Serial(self.ports[1].name, timeout=2) as b:
+                writer = threading.Thread(target=a.write, args=(data,))
+                writer.start()
+                self.assertEqual(b.read(len(data)), data)
+                writer.join()
+                b.write(b'\r\n\x03\x04')
+                self.assertEqual(a.read(4), b'\r\n\x03\x04')
+
+    def test_unix_socket(self):
+        """simulators connect through a Unix socket, reconnects are possible"""
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, '0')
+        try:
+            with virtual_ports.Pump() as pump, \
+                    serial.Serial(self.ports[0].name, timeout=2) as ser:
+                pump.listen(self.ports[0], path)
+                for n in range(2):
+                    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as simulator:
+                        simulator.settimeout(2)
+                        simulator.connect(path)
+                        simulator.sendall(b'ping')
+                        self.assertEqual(ser.read(4), b'ping')
+                        ser.write(b'pong')
+                        self.assertEqual(simulator.recv(4), b'pong')
+            self.assertFalse(os.path.exists(path))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    import sys
+    sys.stdout.write(__doc__)
+    sys.argv[1:] = ['-v']
+    # When this module is executed from the command-line, it runs all its tests
+    unittest.main()